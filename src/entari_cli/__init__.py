@@ -1,8 +1,9 @@
-import importlib
-import pkgutil
+from typing import TYPE_CHECKING, Optional
 
 # import traceback
-from clilte import CommandLine
+from arclet.alconna import Arparma
+from clilte import CommandLine, register
+from clilte.core import TPlugin
 from colorama.ansi import Fore
 
 from .i18n import Lang
@@ -11,7 +12,38 @@ i18n_ = Lang.entari_cli
 
 __version__ = "0.4.1"
 
-cli = CommandLine(
+if TYPE_CHECKING:
+    from .context import ProjectContext
+
+
+class EntariCommandLine(CommandLine):
+    _context: Optional["ProjectContext"] = None
+
+    @property
+    def context(self) -> "ProjectContext":
+        if self._context is None:
+            from .context import ProjectContext
+
+            self._context = ProjectContext()
+        return self._context
+
+    def _handle_dispatch(self, res: Arparma):
+        from .context import ProjectContext
+
+        self._context = ProjectContext(config_path=res.query[str]("cfg_path.path", None))
+        return super()._handle_dispatch(res)
+
+    def get_plugin(self, plg: type[TPlugin]) -> Optional[TPlugin]:
+        target = f"{plg.__module__}:{plg.__qualname__}"
+        for plugin in self.plugins.values():
+            if isinstance(plugin, plg):
+                return plugin
+            if isinstance(plugin, LazyPlugin) and plugin.spec.target == target:
+                return plugin.load()  # type: ignore
+        return None
+
+
+cli = EntariCommandLine(
     title="Entari CLI",
     version=__version__,
     rich=True,
@@ -28,7 +60,7 @@ def printer(exc: Exception) -> None:
 
 cli.exception_printer = printer
 
-COMMANDS_MODULE_PATH = importlib.import_module("entari_cli.commands").__path__
+from .commands import MANIFEST, LazyPlugin, lazy_plugin
 
-for _, name, _ in pkgutil.iter_modules(COMMANDS_MODULE_PATH):
-    importlib.import_module(f"entari_cli.commands.{name}", __name__)
+for spec in MANIFEST.values():
+    register("entari_cli.plugins")(lazy_plugin(spec))
@@ -0,0 +1,149 @@
+"""Persistent caches of the CLI, stored under the user cache directory.
+
+Set the `ENTARI_CLI_NO_CACHE` environment variable or pass `--no-cache` to bypass them,
+and run `entari cache clear` to drop everything that has been cached.
+"""
+
+from __future__ import annotations
+
+import atexit
+import json
+import os
+import shutil
+import time
+from pathlib import Path
+from typing import Any
+
+from platformdirs import user_cache_path
+
+NO_CACHE_ENV = "ENTARI_CLI_NO_CACHE"
+
+_enabled = os.getenv(NO_CACHE_ENV, "").strip().lower() not in {"1", "true", "yes", "on"}
+# the downloads and venv templates kept for unpinned requirements are dropped after this long,
+# so that new releases get picked up
+ARTIFACT_TTL = 7 * 24 * 60 * 60
+
+
+def cache_enabled() -> bool:
+    return _enabled
+
+
+def disable_cache() -> None:
+    global _enabled
+
+    _enabled = False
+
+
+def get_cache_dir() -> Path:
+    return user_cache_path("entari-cli", appauthor=False)
+
+
+def fingerprint(path: str | os.PathLike[str]) -> tuple[int, int, int] | None:
+    """Return the (inode, mtime, size) of the file, or None if it cannot be stat-ed."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_ino, st.st_mtime_ns, st.st_size
+
+
+def expired(timestamp: float, ttl: float = ARTIFACT_TTL) -> bool:
+    return time.time() - timestamp > ttl
+
+
+_loaded_caches: list[JSONCache] = []
+
+
+class JSONCache:
+    """A key-value store persisted as a single JSON file in the cache directory.
+
+    Entries are keyed by a string and carry the fingerprint of the file they describe,
+    so an entry is discarded as soon as that file changes on disk.
+    Changes are written back once, when the process exits.
+    """
+
+    def __init__(self, name: str, version: int = 1):
+        self.name = name
+        self.version = version
+        self._data: dict[str, dict[str, Any]] | None = None
+        self._dirty = False
+
+    @property
+    def path(self) -> Path:
+        return get_cache_dir() / f"{self.name}.json"
+
+    @property
+    def data(self) -> dict[str, dict[str, Any]]:
+        if self._data is None:
+            self._data = {}
+            try:
+                with self.path.open("r", encoding="utf-8") as f:
+                    raw = json.load(f)
+                if raw.get("version") == self.version:
+                    self._data = raw.get("entries", {})
+            except (OSError, ValueError, AttributeError):
+                pass
+            _loaded_caches.append(self)
+        return self._data
+
+    def get(self, key: str, file: str | os.PathLike[str]) -> dict[str, Any] | None:
+        """Get the entry of the key if it is still valid for the file."""
+        if not cache_enabled():
+            return None
+        entry = self.data.get(key)
+        if entry is None:
+            return None
+        # stored as a JSON array
+        if tuple(entry.get("$fingerprint") or ()) != fingerprint(file):
+            self.data.pop(key, None)
+            self._dirty = True
+            return None
+        return entry
+
+    def update(self, key: str, file: str | os.PathLike[str], **values: Any) -> None:
+        """Merge the values into the entry of the key, bound to the current state of the file."""
+        if not cache_enabled():
+            return
+        fp = fingerprint(file)
+        if fp is None:
+            return
+        entry = self.data.get(key)
+        if entry is None or tuple(entry.get("$fingerprint") or ()) != fp:
+            entry = self.data[key] = {"$fingerprint": list(fp)}
+        entry.update(values)
+        self._dirty = True
+
+    def invalidate(self, key: str | None = None) -> None:
+        if key is None:
+            self._data = {}
+        else:
+            self.data.pop(key, None)
+        self._dirty = True
+
+    def flush(self) -> None:
+        if not self._dirty or self._data is None:
+            return
+        self._dirty = False
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(".tmp")
+            with tmp.open("w", encoding="utf-8") as f:
+                json.dump({"version": self.version, "entries": self._data}, f)
+            os.replace(tmp, self.path)
+        except OSError:
+            pass
+
+
+@atexit.register
+def flush_caches() -> None:
+    """Write back the changes of every cache loaded in this process."""
+    for cache in _loaded_caches:
+        cache.flush()
+
+
+def clear_cache() -> Path:
+    """Remove every cache file, returning the cache directory."""
+    cache_dir = get_cache_dir()
+    if cache_dir.exists():
+        shutil.rmtree(cache_dir, ignore_errors=True)
+    return cache_dir
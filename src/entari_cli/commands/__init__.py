@@ -0,0 +1,282 @@
+"""Static manifest of the built-in commands.
+
+Every command is declared here with its parser definition and metadata only, so that
+`CommandLine` can parse the command line without importing the command modules.
+The module that implements a command (and its heavy dependencies) is imported lazily
+when the command is actually dispatched.
+"""
+
+from __future__ import annotations
+
+import importlib
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Callable, ClassVar
+
+from arclet.alconna import Alconna, Args, Arparma, CommandMeta, MultiVar, Option
+from clilte import BasePlugin, CommandLine, PluginMetadata
+from clilte.core import Next
+from tarina.lang.model import LangItem
+
+from entari_cli import i18n_
+
+if TYPE_CHECKING:
+    from entari_cli.context import ProjectContext
+
+
+@dataclass(frozen=True)
+class CommandSpec:
+    name: str
+    """the key used to detect the command in the parse result"""
+    target: str
+    """the `module:attr` path of the plugin implementing the command"""
+    build: Callable[[], Alconna | tuple[Option, bool]]
+    description: LangItem
+    version: str = "0.1.0"
+    priority: int = 16
+    tags: tuple[str, ...] = field(default_factory=tuple)
+    author: tuple[str, ...] = field(default_factory=tuple)
+
+    def meta(self) -> PluginMetadata:
+        return PluginMetadata(
+            name=self.name,
+            version=self.version,
+            description=self.description(),
+            tags=list(self.tags),
+            author=list(self.author),
+            priority=self.priority,
+        )
+
+
+MANIFEST: dict[str, CommandSpec] = {}
+
+
+def manifest(name: str, target: str, description: LangItem, **kwargs):
+    """Declare a built-in command in the manifest."""
+
+    def wrapper(func: Callable[[], Alconna | tuple[Option, bool]]):
+        MANIFEST[name] = CommandSpec(name, target, func, description, **kwargs)
+        return func
+
+    return wrapper
+
+
+class CommandPlugin(BasePlugin):
+    """Base class of the built-in commands, whose command and metadata come from the manifest."""
+
+    spec: ClassVar[CommandSpec]
+
+    def __init_subclass__(cls, command: str | None = None, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if command is not None:
+            cls.spec = MANIFEST[command]
+
+    def init(self):
+        return self.spec.build()
+
+    def meta(self) -> PluginMetadata:
+        return self.spec.meta()
+
+    @property
+    def context(self) -> ProjectContext:
+        """The project context of the current invocation."""
+        return CommandLine.current().context  # type: ignore
+
+
+class LazyPlugin(CommandPlugin):
+    """Placeholder plugin that imports the implementation only when its command is dispatched."""
+
+    _target: CommandPlugin | None = None
+
+    def load(self) -> CommandPlugin:
+        if self._target is None:
+            module, _, attr = self.spec.target.partition(":")
+            cls: type[CommandPlugin] = getattr(importlib.import_module(module), attr)
+            # The command is already built and registered by this placeholder,
+            # so the implementation shares its state instead of being initialized again.
+            target = cls.__new__(cls)
+            target.__dict__.update(self.__dict__)
+            self._target = target
+        return self._target
+
+    def dispatch(self, result: Arparma, next_: Next):
+        if not result.find(self.spec.name):
+            return next_(None)
+        return self.load().dispatch(result, next_)
+
+
+def lazy_plugin(spec: CommandSpec) -> type[LazyPlugin]:
+    return type(f"Lazy{spec.target.rpartition(':')[2]}", (LazyPlugin,), {"spec": spec})
+
+
+@manifest("adapter", "entari_cli.commands.adapter:AdapterPlugin", i18n_.commands.adapter.description)
+def adapter():
+    return Alconna(
+        "adapter",
+        Option("add", help_text=i18n_.commands.adapter.options.add()),
+        Option("list", help_text=i18n_.commands.adapter.options.list()),
+        Option("remove", help_text=i18n_.commands.adapter.options.remove()),
+        Option("--all", help_text=i18n_.commands.adapter.options.all()),
+        Option(
+            "--adapters",
+            Args["names/", MultiVar(str)],
+            help_text=i18n_.commands.adapter.options.adapters(),
+        ),
+        meta=CommandMeta(i18n_.commands.adapter.description()),
+    )
+
+
+@manifest("add", "entari_cli.commands.add:AddPlugin", i18n_.commands.add.description)
+def add():
+    return Alconna(
+        "add",
+        Args["name/", MultiVar(str, "*")],
+        Option("--key", Args["key/", str], help_text=i18n_.commands.add.options.key()),
+        Option("-D|--disabled", help_text=i18n_.commands.add.options.disabled()),
+        Option("-O|--optional", help_text=i18n_.commands.add.options.optional()),
+        Option("-p|--priority", Args["num/", int], help_text=i18n_.commands.add.options.priority()),
+        meta=CommandMeta(i18n_.commands.add.description()),
+    )
+
+
+@manifest("apply", "entari_cli.commands.apply:ApplyOperations", i18n_.commands.apply.description)
+def apply():
+    return Alconna(
+        "apply",
+        Args[f"file/?#{i18n_.commands.apply.file()}", str],
+        meta=CommandMeta(i18n_.commands.apply.description()),
+    )
+
+
+@manifest("cache", "entari_cli.commands.cache:CacheCommand", i18n_.commands.cache.description)
+def cache():
+    return Alconna(
+        "cache",
+        Option("clear", help_text=i18n_.commands.cache.options.clear()),
+        meta=CommandMeta(i18n_.commands.cache.description()),
+    )
+
+
+@manifest("cfg_path", "entari_cli.commands.cfg_path:ConfigPath", i18n_.commands.config_path)
+def cfg_path():
+    return Option("-c|--config", Args["path/", str], help_text=i18n_.commands.config_path(), dest="cfg_path"), True
+
+
+@manifest("gen_main", "entari_cli.commands.generate:GenerateMain", i18n_.commands.generate.description)
+def generate():
+    return Alconna("gen_main", meta=CommandMeta(i18n_.commands.generate.description()))
+
+
+@manifest("init", "entari_cli.commands.init:InitEnv", i18n_.commands.init.description)
+def init():
+    return Alconna(
+        "init",
+        Option("-d|--dev", help_text=i18n_.commands.init.options.develop()),
+        Option("-py|--python", Args["path/", str], help_text=i18n_.commands.init.options.python()),
+        Option(
+            "--install-args",
+            Args["params/", MultiVar(str)],
+            help_text=i18n_.commands.init.options.install_args(),
+            dest="install",
+        ),
+        meta=CommandMeta(i18n_.commands.init.description()),
+    )
+
+
+@manifest("new", "entari_cli.commands.new:NewPlugin", i18n_.commands.new.description)
+def new():
+    return Alconna(
+        "new",
+        Args["name/?", str],
+        Option("-S|--static", help_text=i18n_.commands.new.options.static()),
+        Option("-A|--application", help_text=i18n_.commands.new.options.application()),
+        Option("-f|--file", help_text=i18n_.commands.new.options.file()),
+        Option("-D|--disabled", help_text=i18n_.commands.new.options.disabled()),
+        Option("-O|--optional", help_text=i18n_.commands.new.options.optional()),
+        Option("-p|--priority", Args["num/", int], help_text=i18n_.commands.new.options.priority()),
+        Option("-py|--python", Args["path/", str], help_text=i18n_.commands.new.options.python()),
+        Option(
+            "--install-args",
+            Args["params/", MultiVar(str)],
+            help_text=i18n_.commands.new.options.install_args(),
+            dest="install",
+        ),
+        meta=CommandMeta(i18n_.commands.new.description()),
+    )
+
+
+@manifest("no_cache", "entari_cli.commands.no_cache:NoCache", i18n_.commands.no_cache, priority=0)
+def no_cache():
+    return Option("--no-cache", help_text=i18n_.commands.no_cache(), dest="no_cache"), True
+
+
+@manifest("offline", "entari_cli.commands.offline:Offline", i18n_.commands.offline, priority=0)
+def offline():
+    return Option("--offline", help_text=i18n_.commands.offline(), dest="offline"), True
+
+
+@manifest("remove", "entari_cli.commands.remove:RemovePlugin", i18n_.commands.remove.description)
+def remove():
+    return Alconna(
+        "remove",
+        Args["name/", MultiVar(str, "*")],
+        Option("--key", Args["key/", str], help_text=i18n_.commands.remove.options.key()),
+        Option("-D|--keep", help_text=i18n_.commands.remove.options.keep()),
+        meta=CommandMeta(i18n_.commands.remove.description()),
+    )
+
+
+@manifest("run", "entari_cli.commands.run:RunApplication", i18n_.commands.run.description)
+def run():
+    return Alconna(
+        "run",
+        Option("--exec", help_text=i18n_.commands.run.options.exec(), dest="exec"),
+        Option("--no-exec", help_text=i18n_.commands.run.options.no_exec(), dest="no_exec"),
+        Option(
+            "--restart", Args["policy/", str], help_text=i18n_.commands.run.options.restart(), separators=("=", " ")
+        ),
+        Option(
+            "--max-restarts",
+            Args["num/", int],
+            help_text=i18n_.commands.run.options.max_restarts(),
+            dest="max_restarts",
+            separators=("=", " "),
+        ),
+        Option(
+            "--backoff", Args["seconds/", float], help_text=i18n_.commands.run.options.backoff(), separators=("=", " ")
+        ),
+        meta=CommandMeta(i18n_.commands.run.description()),
+    )
+
+
+@manifest("setting", "entari_cli.commands.setting:SelfSetting", i18n_.commands.setting.description, priority=1)
+def setting():
+    return Alconna(
+        "setting",
+        Args[f"key/?#{i18n_.commands.setting.key()}", str][f"value/#{i18n_.commands.setting.key()}", str, ""],
+        Option("-l|--local", help_text=i18n_.commands.setting.options.local()),
+        Option("-d|--delete", help_text=i18n_.commands.setting.options.delete()),
+        Option("-e|--edit", help_text=i18n_.commands.setting.options.edit()),
+        meta=CommandMeta(i18n_.commands.setting.description()),
+    )
+
+
+@manifest(
+    "version",
+    "entari_cli.commands.version:Version",
+    i18n_.commands.version.description,
+    priority=0,
+    tags=("version",),
+    author=("RF-Tar-Railt",),
+)
+def version():
+    return Option("--version|-V", help_text=i18n_.commands.version.description()), False
+
+
+@manifest("wheelhouse", "entari_cli.commands.wheelhouse:WheelhouseCommand", i18n_.commands.wheelhouse.description)
+def wheelhouse():
+    return Alconna(
+        "wheelhouse",
+        Option("build", help_text=i18n_.commands.wheelhouse.options.build()),
+        Option("-d|--dir", Args["path/", str], help_text=i18n_.commands.wheelhouse.options.dir()),
+        meta=CommandMeta(i18n_.commands.wheelhouse.description()),
+    )
@@ -1,13 +1,13 @@
-from arclet.alconna import Alconna, Arparma, CommandMeta, Option
-from clilte import BasePlugin, CommandLine, PluginMetadata, register
+from arclet.alconna import Arparma
+from clilte import CommandLine
 from clilte.core import Next
 from colorama import Fore
 
 from entari_cli import i18n_
-from entari_cli.config import EntariConfig
+from entari_cli.commands import CommandPlugin
 from entari_cli.consts import YES
-from entari_cli.project import get_project_root, install_dependencies, uninstall_dependencies
-from entari_cli.py_info import check_package_installed, get_default_python
+from entari_cli.project import install_dependencies, uninstall_dependencies
+from entari_cli.py_info import check_package_installed
 from entari_cli.utils import ask
 
 ADAPTERS = {
@@ -24,31 +24,61 @@ ADAPTERS = {
 }
 
 
-@register("entari_cli.plugins")
-class AdapterPlugin(BasePlugin):
-    def init(self):
-        return Alconna(
-            "adapter",
-            Option("add", help_text=i18n_.commands.adapter.options.add()),
-            Option("list", help_text=i18n_.commands.adapter.options.list()),
-            Option("remove", help_text=i18n_.commands.adapter.options.remove()),
-            meta=CommandMeta(i18n_.commands.adapter.description()),
-        )
+def parse_selection(selection: str, size: int) -> list[int]:
+    """Parse a selection like `1,3,5` or `0-2 4` into the indexes it covers, in order and without duplicates."""
+    indexes: list[int] = []
+    for part in selection.replace(",", " ").split():
+        start, sep, end = part.partition("-")
+        if not start.isdigit() or (sep and (not end.isdigit() or int(end) < int(start))):
+            raise ValueError(i18n_.commands.adapter.prompts.invalid_selection())
+        for i in range(int(start), int(end if sep else start) + 1):
+            if i >= size:
+                raise ValueError(i18n_.commands.adapter.prompts.invalid_selection())
+            if i not in indexes:
+                indexes.append(i)
+    if not indexes:
+        raise ValueError(i18n_.commands.adapter.prompts.invalid_selection())
+    return indexes
+
+
+def select_adapters(result: Arparma, candidates: list[tuple[str, str, str, str]]) -> list[tuple[str, str, str, str]]:
+    """Pick among the candidates from `--all`, `--adapters` or an interactive multi-selection."""
+    if result.find("adapter.all"):
+        return candidates
+    names: tuple[str, ...] = result.query[tuple]("adapter.adapters.names", ())
+    if names:
+        lookup = {}
+        for slot in candidates:
+            lookup[slot[0].lower()] = slot
+            lookup[slot[1]] = slot
+        selected = []
+        for name in names:
+            slot = lookup.get(name.lower(), lookup.get(name))
+            if slot is None:
+                raise ValueError(i18n_.commands.adapter.messages.unknown_adapter(name=name))
+            if slot not in selected:
+                selected.append(slot)
+        return selected
+    offset = max(len(slot[0]) for slot in candidates) + 1
+    print(i18n_.commands.adapter.prompts.select_adapter())
+    for i, (name, _, pkg, desc) in enumerate(candidates):
+        print(f"{i:>2}. {Fore.GREEN}{name:<{offset}}{Fore.RESET} {desc} ({pkg})")
+    selection = ask(i18n_.commands.adapter.prompts.please_select())
+    return [candidates[i] for i in parse_selection(selection, len(candidates))]
+
 
-    def meta(self) -> PluginMetadata:
-        return PluginMetadata(
-            name="remove",
-            description=i18n_.commands.adapter.description(),
-            version="0.1.0",
-        )
+def configured_adapters(data: dict) -> set[str]:
+    return {adapter["$path"].replace("satori.adapters.", "@") for adapter in data.get("adapters", [])}
 
+
+class AdapterPlugin(CommandPlugin, command="adapter"):
     def dispatch(self, result: Arparma, next_: Next):
         from entari_cli.commands.setting import SelfSetting
 
         if result.find("adapter.list"):
             output = f"{Fore.GREEN}{i18n_.commands.adapter.messages.list_header()}{Fore.RESET}\n"
-            cfg = EntariConfig.load(result.query[str]("cfg_path.path", None), get_project_root())
-            adapters = {adapter["$path"].replace("satori.adapters.", "@") for adapter in cfg.data.get("adapters", [])}
+            cfg = self.context.config(readonly=True)
+            adapters = configured_adapters(cfg.data)
             offset = max(len(name) for name in ADAPTERS.keys()) + 1
             for name, (key, _, desc) in ADAPTERS.items():
                 status = key in adapters
@@ -56,73 +86,71 @@ class AdapterPlugin(BasePlugin):
             return output
 
         if result.find("adapter.add"):
-            cfg = EntariConfig.load(result.query[str]("cfg_path.path", None), get_project_root())
+            cfg = self.context.config()
             if "server" not in cfg.plugin and "entari_plugin_server" not in cfg.plugin:
                 print(f"{Fore.YELLOW}{i18n_.commands.adapter.messages.server_not_installed()}{Fore.RESET}\n")
-                ans = (
-                    ask(f"{Fore.BLUE}{i18n_.commands.adapter.prompts.confirm_install()}{Fore.RESET} " "Y/n")
-                    .strip()
-                    .lower()
-                )
-                continue_install = ans in YES
-                if not continue_install:
-                    return next_(None)
-            adapters = {adapter["$path"].replace("satori.adapters.", "@") for adapter in cfg.data.get("adapters", [])}
+                if not (result.find("adapter.all") or result.find("adapter.adapters")):
+                    ans = (
+                        ask(f"{Fore.BLUE}{i18n_.commands.adapter.prompts.confirm_install()}{Fore.RESET} " "Y/n")
+                        .strip()
+                        .lower()
+                    )
+                    continue_install = ans in YES
+                    if not continue_install:
+                        return next_(None)
+            adapters = configured_adapters(cfg.data)
             install = []
             for name, (key, pkg, desc) in ADAPTERS.items():
                 if key not in adapters:
                     install.append((name, key, pkg, desc))
             if not install:
                 return f"{Fore.YELLOW}{i18n_.commands.adapter.messages.all_installed()}{Fore.RESET}\n"
-            offset = max(len(slot[0]) for slot in install) + 1
-            print(i18n_.commands.adapter.prompts.select_adapter())
-            for i, (name, _, pkg, desc) in enumerate(install):
-                print(f"{i:>2}. {Fore.GREEN}{name:<{offset}}{Fore.RESET} {desc} ({pkg})")
-            selection = ask(i18n_.commands.adapter.prompts.please_select())
-            if not selection.isdigit() or int(selection) < 0 or int(selection) >= len(install):
-                raise ValueError(i18n_.commands.adapter.prompts.invalid_selection())
-            name, key, pkg, _ = install[int(selection)]
-            if not check_package_installed(pkg):
+            selected = select_adapters(result, install)
+            # several adapters may share one distribution
+            pkgs = list(dict.fromkeys(pkg for _, _, pkg, _ in selected))
+            missing = [pkg for pkg in pkgs if not check_package_installed(pkg, self.context.python)]
+            if missing:
                 retcode = install_dependencies(
                     CommandLine.current().get_plugin(SelfSetting),  # type: ignore
-                    [pkg],
-                    get_default_python(get_project_root()),
+                    missing,
+                    self.context.python,
                 )
                 if retcode != 0:
-                    return f"{Fore.RED}{i18n_.commands.adapter.messages.install_failed(name=f'{Fore.BLUE}{pkg}')}{Fore.RESET}\n"  # noqa: E501
-            cfg.data.setdefault("adapters", [])
-            cfg.data["adapters"].append({"$path": key})
-            cfg.save()
-            return f"{Fore.GREEN}{i18n_.commands.adapter.messages.add_success(name=name)}{Fore.RESET}\n"
+                    failed = ", ".join(missing)
+                    return f"{Fore.RED}{i18n_.commands.adapter.messages.install_failed(name=f'{Fore.BLUE}{failed}')}{Fore.RESET}\n"  # noqa: E501
+            with cfg.transaction() as tx:
+                for _, key, _, _ in selected:
+                    tx.add_adapter(key)
+            names = ", ".join(slot[0] for slot in selected)
+            return f"{Fore.GREEN}{i18n_.commands.adapter.messages.add_success(name=names)}{Fore.RESET}\n"
 
         if result.find("adapter.remove"):
-            cfg = EntariConfig.load(result.query[str]("cfg_path.path", None), get_project_root())
-            adapters = {adapter["$path"].replace("satori.adapters.", "@") for adapter in cfg.data.get("adapters", [])}
+            cfg = self.context.config()
+            adapters = configured_adapters(cfg.data)
             install = []
             for name, (key, pkg, desc) in ADAPTERS.items():
                 if key in adapters:
                     install.append((name, key, pkg, desc))
             if not install:
                 return f"{Fore.YELLOW}{i18n_.commands.adapter.messages.none_installed()}{Fore.RESET}\n"
-            offset = max(len(slot[0]) for slot in install) + 1
-            print(i18n_.commands.adapter.prompts.select_adapter())
-            for i, (name, _, pkg, desc) in enumerate(install):
-                print(f"{i:>2}. {Fore.GREEN}{name:<{offset}}{Fore.RESET} {desc} ({pkg})")
-            selection = ask(i18n_.commands.adapter.prompts.please_select())
-            if not selection.isdigit() or int(selection) < 0 or int(selection) >= len(install):
-                raise ValueError(i18n_.commands.adapter.prompts.invalid_selection())
-            name, key, pkg, _ = install[int(selection)]
-            cfg.data["adapters"] = [
-                adapter
-                for adapter in cfg.data.get("adapters", [])
-                if adapter["$path"].replace("satori.adapters.", "@") != key
+            selected = select_adapters(result, install)
+            with cfg.transaction() as tx:
+                for _, key, _, _ in selected:
+                    tx.remove_adapter(key)
+            # only uninstall the distributions no remaining adapter comes from
+            remaining = configured_adapters(cfg.data)
+            in_use = {pkg for key, pkg, _ in ADAPTERS.values() if key in remaining}
+            pkgs = [
+                pkg
+                for pkg in dict.fromkeys(pkg for _, _, pkg, _ in selected)
+                if pkg not in in_use and check_package_installed(pkg, self.context.python)
             ]
-            cfg.save()
-            if check_package_installed(pkg):
+            if pkgs:
                 uninstall_dependencies(
                     CommandLine.current().get_plugin(SelfSetting),  # type: ignore
-                    [name],
-                    get_default_python(get_project_root()),
+                    pkgs,
+                    self.context.python,
                 )
-            return f"{Fore.GREEN}{i18n_.commands.adapter.messages.remove_success(name=name)}{Fore.RESET}\n"
+            names = ", ".join(slot[0] for slot in selected)
+            return f"{Fore.GREEN}{i18n_.commands.adapter.messages.remove_success(name=names)}{Fore.RESET}\n"
         return next_(CommandLine.current()._command.formatter.format_node(["entari", "adapter"]))
@@ -1,70 +1,95 @@
-from arclet.alconna import Alconna, Args, Arparma, CommandMeta, Option
-from clilte import BasePlugin, CommandLine, PluginMetadata, register
+from typing import Optional
+
+from arclet.alconna import Arparma
+from clilte import CommandLine
 from clilte.core import Next
 from colorama import Fore
 
 from entari_cli import i18n_
-from entari_cli.config import EntariConfig
-from entari_cli.project import get_project_root, install_dependencies
-from entari_cli.py_info import check_package_installed, get_default_python, get_package_module
+from entari_cli.commands import CommandPlugin
+from entari_cli.project import install_dependencies
+from entari_cli.py_info import query_packages
+
 
+def resolve_plugins(names: list[str], python: str) -> dict[str, tuple[Optional[str], bool]]:
+    """Find the config key of each plugin, and whether its distribution has to be installed first.
 
-@register("entari_cli.plugins")
-class AddPlugin(BasePlugin):
-    def init(self):
-        return Alconna(
-            "add",
-            Args["name/?", str],
-            Option("--key", Args["key/", str], help_text=i18n_.commands.add.options.key()),
-            Option("-D|--disabled", help_text=i18n_.commands.add.options.disabled()),
-            Option("-O|--optional", help_text=i18n_.commands.add.options.optional()),
-            Option("-p|--priority", Args["num/", int], help_text=i18n_.commands.add.options.priority()),
-            meta=CommandMeta(i18n_.commands.add.description()),
-        )
+    The candidates of every name are probed in a single query, then the first one found wins for each name.
+    """
+    requests: list[tuple[str, tuple[str, ...]]] = [("plugin_entry_points", ())]
+    for name_ in names:
+        requests += [("find_spec", (name_,)), ("distribution", (name_,)), ("package_module", (name_,))]
+        if not name_.count("."):
+            requests.append(("find_spec", (f"entari_plugin_{name_}",)))
+    requests = list(dict.fromkeys(requests))
+    answers = dict(zip(requests, query_packages(requests, python)))
+    entry_points = answers[("plugin_entry_points", ())] or {}
+    resolved: dict[str, tuple[Optional[str], bool]] = {}
+    for name_ in names:
+        if answers[("find_spec", (name_,))] is not None:
+            resolved[name_] = name_, False
+        elif answers[("distribution", (name_,))]:
+            resolved[name_] = answers[("package_module", (name_,))] or name_.replace("-", "_"), False
+        elif not name_.count(".") and answers[("find_spec", (f"entari_plugin_{name_}",))] is not None:
+            resolved[name_] = name_, False
+        elif name_ in entry_points:
+            # a plugin declared by an installed distribution, under its entry point name
+            resolved[name_] = entry_points[name_][0].split(":", 1)[0].strip(), False
+        else:
+            resolved[name_] = None, True
+    return resolved
 
-    def meta(self) -> PluginMetadata:
-        return PluginMetadata(
-            name="add",
-            description=i18n_.commands.add.description(),
-            version="0.1.0",
-        )
 
+class AddPlugin(CommandPlugin, command="add"):
     def dispatch(self, result: Arparma, next_: Next):
         from entari_cli.commands.setting import SelfSetting
 
         if result.find("add"):
-            name = result.query[str]("add.name")
-            if not name:
-                name = input(f"{Fore.BLUE}{i18n_.commands.add.prompts.name}{Fore.RESET}").strip()
-            cfg = EntariConfig.load(result.query[str]("cfg_path.path", None), get_project_root())
-            name_ = name.replace("::", "arclet.entari.builtins.")
-            if name_.startswith("arclet.entari.builtins."):
-                key = name
-                if not check_package_installed(name_, local=True):
-                    return f"{Fore.RED}{i18n_.commands.add.prompts.builtins_not_found(name=f'{Fore.BLUE}{name_}')}{Fore.RESET}\n"  # noqa: E501
-            else:
-                if check_package_installed(name_, local=True):
-                    key = result.query[str]("add.key.key", name_)
-                elif check_package_installed(name_):
-                    key = result.query[str]("add.key.key", get_package_module(name_) or name_.replace("-", "_"))
-                elif not name_.count(".") and check_package_installed(f"entari_plugin_{name_}", local=True):
-                    key = result.query[str]("add.key.key", name_)
+            names = list(result.query[tuple]("add.name", ()))
+            if not names:
+                names = input(f"{Fore.BLUE}{i18n_.commands.add.prompts.name}{Fore.RESET}").split()
+            if len(names) > 1 and result.find("add.key"):
+                return f"{Fore.RED}{i18n_.commands.add.prompts.key_with_many()}{Fore.RESET}\n"
+            cfg = self.context.config()
+            python = self.context.python
+            keys: dict[str, str] = {}
+            missing: list[str] = []
+            resolved = resolve_plugins([name.replace("::", "arclet.entari.builtins.") for name in names], python)
+            for name in names:
+                name_ = name.replace("::", "arclet.entari.builtins.")
+                key, install = resolved[name_]
+                if name_.startswith("arclet.entari.builtins."):
+                    if install:
+                        return f"{Fore.RED}{i18n_.commands.add.prompts.builtins_not_found(name=f'{Fore.BLUE}{name_}')}{Fore.RESET}\n"  # noqa: E501
+                    keys[name] = name
+                elif install:
+                    missing.append(name_)
                 else:
-                    retcode = install_dependencies(
-                        CommandLine.current().get_plugin(SelfSetting),  # type: ignore
-                        [name_],
-                        get_default_python(get_project_root()),
+                    keys[name] = result.query[str]("add.key.key", key)
+            if missing:
+                # a single resolver run for every plugin that is not installed yet
+                retcode = install_dependencies(
+                    CommandLine.current().get_plugin(SelfSetting),  # type: ignore
+                    missing,
+                    python,
+                )
+                if retcode != 0:
+                    failed = ", ".join(missing)
+                    return f"{Fore.RED}{i18n_.commands.add.prompts.failed(name=f'{Fore.BLUE}{failed}', cmd=f'{Fore.GREEN}`entari new {missing[0]}`')}{Fore.RESET}\n"  # noqa: E501
+                modules = dict(
+                    zip(missing, query_packages([("package_module", (name_,)) for name_ in missing], python))
+                )
+                for name in names:
+                    name_ = name.replace("::", "arclet.entari.builtins.")
+                    if name_ in modules:
+                        keys[name] = result.query[str]("add.key.key", modules[name_] or name_.replace("-", "_"))
+            with cfg.transaction() as tx:
+                for name in names:
+                    tx.add(
+                        keys[name],
+                        disabled=result.find("add.disabled"),
+                        optional=result.find("add.optional"),
+                        priority=result.query[int]("add.priority.num", 16) if result.find("add.priority") else None,
                     )
-                    if retcode != 0:
-                        return f"{Fore.RED}{i18n_.commands.add.prompts.failed(name=f'{Fore.BLUE}{name_}', cmd=f'{Fore.GREEN}`entari new {name_}`')}{Fore.RESET}\n"  # noqa: E501
-                    key = result.query[str]("add.key.key", get_package_module(name_) or name_.replace("-", "_"))
-            cfg.plugin[key] = {}
-            if result.find("add.disabled"):
-                cfg.plugin[key]["$disable"] = True
-            if result.find("add.optional"):
-                cfg.plugin[key]["$optional"] = True
-            if result.find("add.priority"):
-                cfg.plugin[key]["priority"] = result.query[int]("add.priority.num", 16)
-            cfg.save()
-            return f"{Fore.GREEN}{i18n_.commands.add.prompts.success(name=name)}{Fore.RESET}\n"
+            return f"{Fore.GREEN}{i18n_.commands.add.prompts.success(name=', '.join(names))}{Fore.RESET}\n"
         return next_(None)
@@ -0,0 +1,51 @@
+import json
+import sys
+from collections.abc import Mapping
+from pathlib import Path
+
+from arclet.alconna import Arparma
+from clilte.core import Next
+from colorama import Fore
+
+from entari_cli import i18n_
+from entari_cli.commands import CommandPlugin
+
+
+def read_operations(file: str) -> list:
+    """Read the operations from a JSON or YAML file, or from stdin if the file is empty or `-`.
+
+    The document is either a list of operations, or a mapping with the list under `operations`.
+    """
+    if not file or file == "-":
+        text = sys.stdin.read()
+    else:
+        text = Path(file).read_text(encoding="utf-8")
+    if file.endswith(".json"):
+        data = json.loads(text)
+    else:
+        from ruamel.yaml import YAML
+
+        # JSON is also valid YAML
+        data = YAML(typ="safe").load(text)
+    if isinstance(data, Mapping):
+        data = data.get("operations")
+    if not isinstance(data, list) or not all(isinstance(op, Mapping) for op in data):
+        raise ValueError("expected a list of operations")
+    return data
+
+
+class ApplyOperations(CommandPlugin, command="apply"):
+    def dispatch(self, result: Arparma, next_: Next):
+        if result.find("apply"):
+            cfg = self.context.config()
+            try:
+                operations = read_operations(result.query[str]("apply.file", ""))
+                with cfg.transaction() as tx:
+                    for operation in operations:
+                        tx.apply(operation)
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                return f"{Fore.RED}{i18n_.commands.apply.messages.invalid(error=repr(e))}{Fore.RESET}\n"
+            return (
+                f"{Fore.GREEN}{i18n_.commands.apply.messages.success(count=tx.count, path=str(cfg.path))}{Fore.RESET}\n"
+            )
+        return next_(None)
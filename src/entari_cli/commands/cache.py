@@ -0,0 +1,17 @@
+from arclet.alconna import Arparma
+from clilte.core import Next
+from colorama import Fore
+
+from entari_cli import i18n_
+from entari_cli.cache import clear_cache, get_cache_dir
+from entari_cli.commands import CommandPlugin
+
+
+class CacheCommand(CommandPlugin, command="cache"):
+    def dispatch(self, result: Arparma, next_: Next):
+        if result.find("cache.clear"):
+            path = clear_cache()
+            return f"{Fore.GREEN}{i18n_.commands.cache.messages.cleared(path=str(path))}{Fore.RESET}\n"
+        if result.find("cache"):
+            return f"{i18n_.commands.cache.messages.location(path=str(get_cache_dir()))}\n"
+        return next_(None)
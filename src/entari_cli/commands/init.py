@@ -1,50 +1,29 @@
 import sys
 
 import tomlkit
-from arclet.alconna import Alconna, Args, Arparma, CommandMeta, MultiVar, Option
-from clilte import BasePlugin, CommandLine, PluginMetadata, register
+from arclet.alconna import Arparma
+from clilte import CommandLine
 from clilte.core import Next
 from colorama import Fore
 
 from entari_cli import i18n_
+from entari_cli.commands import CommandPlugin
 from entari_cli.config import create_config
 from entari_cli.consts import ENTARI_VERSION
-from entari_cli.project import ensure_python, get_project_root, install_dependencies
-from entari_cli.py_info import PythonInfo, check_package_installed, get_package_version
+from entari_cli.project import ensure_python, install_dependencies, prefetch_dependencies
+from entari_cli.py_info import PythonInfo, get_package_version, query_packages
 from entari_cli.setting import set_item
 from entari_cli.template import WORKSPACE_PROJECT_TEMPLATE
 from entari_cli.utils import ask
-from entari_cli.venv import get_in_project_venv, get_venv_like_prefix
+from entari_cli.venv import get_in_project_venv, get_venv_like_prefix, save_venv_template
 
 
-@register("entari_cli.plugins")
-class InitEnv(BasePlugin):
-    def init(self):
-        return Alconna(
-            "init",
-            Option("-d|--dev", help_text=i18n_.commands.init.options.develop()),
-            Option("-py|--python", Args["path/", str], help_text=i18n_.commands.init.options.python()),
-            Option(
-                "--install-args",
-                Args["params/", MultiVar(str)],
-                help_text=i18n_.commands.init.options.install_args(),
-                dest="install",
-            ),
-            meta=CommandMeta(i18n_.commands.init.description()),
-        )
-
-    def meta(self) -> PluginMetadata:
-        return PluginMetadata(
-            name="init",
-            description=i18n_.commands.init.description(),
-            version="0.1.0",
-        )
-
+class InitEnv(CommandPlugin, command="init"):
     def dispatch(self, result: Arparma, next_: Next):
         from entari_cli.commands.setting import SelfSetting
 
         if result.find("init"):
-            cwd = get_project_root()
+            cwd = self.context.root
             python = result.query[str]("init.python.path", "")
             args = result.query[tuple[str, ...]]("init.install.params", ())
             is_dev = result.find("init.dev")
@@ -52,12 +31,18 @@ class InitEnv(BasePlugin):
             if is_dev:
                 extra += ["reload"]
             extras = ",".join(extra)
+            deps = [f"arclet.entari[{extras}]"]
             python_path = sys.executable
+            # the downloads run while the questions below are answered
+            prefetch = prefetch_dependencies(CommandLine.current().get_plugin(SelfSetting), deps, args)  # type: ignore
+            created = False
             if get_venv_like_prefix(sys.executable)[0] is None or get_in_project_venv(cwd) is None:
                 ans = ask(i18n_.venv.ask_create(), "Y/n").strip().lower()
                 use_venv = ans in {"yes", "true", "t", "1", "y", "yea", "yeah", "yep", "sure", "ok", "okay", "", "y/n"}
                 if use_venv:
-                    python_path = str(ensure_python(cwd, python).executable)
+                    python_path = str(ensure_python(cwd, python, [*deps, *args]).executable)
+                    self.context.refresh_venv()
+                    created = True
                 print(f"{Fore.GREEN}{i18n_.commands.init.messages.success()}{Fore.RESET}")
             toml_file = cwd / "pyproject.toml"
             if not toml_file.exists():
@@ -70,22 +55,33 @@ class InitEnv(BasePlugin):
                             python_requirement=f'">= {info.major}.{info.minor}"',
                         )
                     )
-            if check_package_installed("arclet-entari", python_path, local=True):
-                print(f"{Fore.YELLOW}{i18n_.commands.init.messages.initialized()}{Fore.RESET}")
+            # both answered at once; the version is asked again only if entari gets installed below
+            installed, entari_version = query_packages(
+                [("find_spec", ("arclet.entari",)), ("version", ("arclet-entari",))], python_path
+            )
+            if installed is not None:
+                # a venv cloned from a template comes with everything installed
+                if not created:
+                    print(f"{Fore.YELLOW}{i18n_.commands.init.messages.initialized()}{Fore.RESET}")
             else:
                 ret_code = install_dependencies(
                     CommandLine.current().get_plugin(SelfSetting),  # type: ignore
-                    [f"arclet.entari[{extras}]"],
+                    deps,
                     python_path,
                     args,
+                    prefetch,
                 )
                 if ret_code != 0:
                     return
+                if created:
+                    save_venv_template(cwd / ".venv")
+                entari_version = get_package_version("arclet-entari", python_path)
             with toml_file.open("a+", encoding="utf-8") as f:
                 f.seek(0)
                 proj = tomlkit.load(f)
-                entari_version = get_package_version("arclet-entari", python_path) or ENTARI_VERSION
-                set_item(proj, "project.dependencies", [f"arclet.entari[{extras}] >= {entari_version}"])
+                set_item(
+                    proj, "project.dependencies", [f"arclet.entari[{extras}] >= {entari_version or ENTARI_VERSION}"]
+                )
                 f.truncate(0)
                 tomlkit.dump(proj, f)
             with create_config(result.query[str]("cfg_path.path"), is_dev):
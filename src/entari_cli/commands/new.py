@@ -2,24 +2,24 @@ import sys
 from pathlib import Path
 
 import tomlkit
-from arclet.alconna import Alconna, Args, Arparma, CommandMeta, MultiVar, Option
-from clilte import BasePlugin, PluginMetadata, register
+from arclet.alconna import Arparma
 from clilte.core import CommandLine, Next
 from colorama import Fore
 
 from entari_cli import i18n_
+from entari_cli.commands import CommandPlugin
 from entari_cli.config import create_config
 from entari_cli.consts import ENTARI_VERSION, NO, YES
 from entari_cli.project import (
     PYTHON_VERSION,
     ensure_python,
-    get_project_root,
     get_user_email_from_git,
     install_dependencies,
+    prefetch_dependencies,
     sanitize_project_name,
     validate_project_name,
 )
-from entari_cli.py_info import PythonInfo, check_package_installed, get_package_version
+from entari_cli.py_info import PythonInfo, check_package_installed, get_package_version, query_packages
 from entari_cli.setting import set_item
 from entari_cli.template import (
     PLUGIN_DEFAULT_TEMPLATE,
@@ -28,45 +28,17 @@ from entari_cli.template import (
     README_TEMPLATE,
 )
 from entari_cli.utils import ask
-from entari_cli.venv import get_in_project_venv, get_venv_like_prefix
+from entari_cli.venv import get_in_project_venv, get_venv_like_prefix, save_venv_template
 
 
-@register("entari_cli.plugins")
-class NewPlugin(BasePlugin):
-    def init(self):
-        return Alconna(
-            "new",
-            Args["name/?", str],
-            Option("-S|--static", help_text=i18n_.commands.new.options.static()),
-            Option("-A|--application", help_text=i18n_.commands.new.options.application()),
-            Option("-f|--file", help_text=i18n_.commands.new.options.file()),
-            Option("-D|--disabled", help_text=i18n_.commands.new.options.disabled()),
-            Option("-O|--optional", help_text=i18n_.commands.new.options.optional()),
-            Option("-p|--priority", Args["num/", int], help_text=i18n_.commands.new.options.priority()),
-            Option("-py|--python", Args["path/", str], help_text=i18n_.commands.new.options.python()),
-            Option(
-                "--install-args",
-                Args["params/", MultiVar(str)],
-                help_text=i18n_.commands.new.options.install_args(),
-                dest="install",
-            ),
-            meta=CommandMeta(i18n_.commands.new.description()),
-        )
-
-    def meta(self) -> PluginMetadata:
-        return PluginMetadata(
-            name="new",
-            description=i18n_.commands.new.description(),
-            version="0.1.0",
-        )
-
+class NewPlugin(CommandPlugin, command="new"):
     def dispatch(self, result: Arparma, next_: Next):
         from entari_cli.commands.setting import SelfSetting
 
         if result.find("new"):
             is_application = result.find("new.application")
             python = result.query[str]("new.python.path", "")
-            cwd = get_project_root()
+            cwd = self.context.root
             toml_path = Path.cwd() / "pyproject.toml"
             use_venv = False
 
@@ -75,6 +47,11 @@ class NewPlugin(BasePlugin):
                 is_application = ans in NO
             if not is_application and (toml_path.exists() or cwd.resolve() != Path.cwd().resolve()):
                 return f"{Fore.RED}{i18n_.commands.new.messages.proj_exists()}{Fore.RESET}"
+            if not is_application:
+                # started before the project questions, so that the downloads overlap them
+                args = result.query[tuple[str, ...]]("new.install.params", ())
+                deps = ["arclet.entari[yaml,cron,reload,dotenv]"]
+                prefetch = prefetch_dependencies(CommandLine.current().get_plugin(SelfSetting), deps, args)  # type: ignore
 
             name = result.query[str]("new.name")
             if not name:
@@ -116,24 +93,32 @@ class NewPlugin(BasePlugin):
                         )
                     )
 
-                args = result.query[tuple[str, ...]]("new.install.params", ())
                 python_path = sys.executable
+                created = False
                 if get_venv_like_prefix(sys.executable)[0] is None or get_in_project_venv(cwd) is None:
                     ans = ask(i18n_.venv.ask_create(), "Y/n").strip().lower()
                     use_venv = ans in YES
                     if use_venv:
-                        python_path = str(ensure_python(Path.cwd(), python).executable)
+                        python_path = str(ensure_python(Path.cwd(), python, [*deps, *args]).executable)
+                        self.context.refresh_venv()
+                        created = True
 
-                if not check_package_installed("arclet.entari", python_path, local=True):
+                installed, entari_version = query_packages(
+                    [("find_spec", ("arclet.entari",)), ("version", ("arclet-entari",))], python_path
+                )
+                if installed is None:
                     ret_code = install_dependencies(
                         CommandLine.current().get_plugin(SelfSetting),  # type: ignore
-                        ["arclet.entari[yaml,cron,reload,dotenv]"],
+                        deps,
                         python_path,
                         args,
+                        prefetch,
                     )
                     if ret_code != 0:
                         return
-                entari_version = get_package_version("arclet-entari", python_path) or ENTARI_VERSION
+                    if created:
+                        save_venv_template(Path.cwd() / ".venv")
+                    entari_version = get_package_version("arclet-entari", python_path)
                 info = PythonInfo.from_path(python_path)
                 default_python_requires = f">={info.major}.{info.minor}"
                 python_requires = ask(i18n_.commands.new.prompts.python_requires(), default_python_requires)
@@ -142,7 +127,9 @@ class NewPlugin(BasePlugin):
                     f.seek(0)
                     proj = tomlkit.load(f)
                     set_item(
-                        proj, "project.dependencies", [f"arclet.entari[yaml,cron,reload,dotenv] >= {entari_version}"]
+                        proj,
+                        "project.dependencies",
+                        [f"arclet.entari[yaml,cron,reload,dotenv] >= {entari_version or ENTARI_VERSION}"],
                     )
                     set_item(proj, "project.requires-python", python_requires)
                     f.truncate(0)
@@ -186,13 +173,14 @@ class NewPlugin(BasePlugin):
                     or file_name.removeprefix("entari_plugin_") in cfg.plugin
                 ):
                     return f"{Fore.RED}{i18n_.commands.new.messages.exists(name=file_name)}{Fore.RESET}"
-                cfg.plugin[file_name] = {}
+                entry = {}
                 if result.find("new.disabled"):
-                    cfg.plugin[file_name]["$disable"] = True
+                    entry["$disable"] = True
                 if result.find("new.optional"):
-                    cfg.plugin[file_name]["$optional"] = True
+                    entry["$optional"] = True
                 if result.find("new.priority"):
-                    cfg.plugin[file_name]["priority"] = result.query[int]("new.priority.num", 16)
+                    entry["priority"] = result.query[int]("new.priority.num", 16)
+                cfg.plugin[file_name] = entry
                 cfg.basic.setdefault("external_dirs", []).append("plugins" if is_application else "src")
             return f"{Fore.GREEN}{i18n_.commands.new.messages.created(path=str(path))}{Fore.RESET}"
         return next_(None)
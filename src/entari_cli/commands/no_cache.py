@@ -0,0 +1,12 @@
+from arclet.alconna import Arparma
+from clilte.core import Next
+
+from entari_cli.cache import disable_cache
+from entari_cli.commands import CommandPlugin
+
+
+class NoCache(CommandPlugin, command="no_cache"):
+    def dispatch(self, result: Arparma, next_: Next):
+        if result.find("no_cache"):
+            disable_cache()
+        return next_(None)
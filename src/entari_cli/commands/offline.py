@@ -0,0 +1,12 @@
+from arclet.alconna import Arparma
+from clilte.core import Next
+
+from entari_cli.commands import CommandPlugin
+from entari_cli.installer import enable_offline
+
+
+class Offline(CommandPlugin, command="offline"):
+    def dispatch(self, result: Arparma, next_: Next):
+        if result.find("offline"):
+            enable_offline()
+        return next_(None)
@@ -1,67 +1,89 @@
-from arclet.alconna import Alconna, Args, Arparma, CommandMeta, Option
-from clilte import BasePlugin, CommandLine, PluginMetadata, register
+from typing import Optional
+
+from arclet.alconna import Arparma
+from clilte import CommandLine
 from clilte.core import Next
 from colorama import Fore
 
 from entari_cli import i18n_
-from entari_cli.config import EntariConfig
-from entari_cli.project import get_project_root, uninstall_dependencies
-from entari_cli.py_info import check_package_installed, get_default_python, get_module_package, get_package_module
+from entari_cli.commands import CommandPlugin
+from entari_cli.project import uninstall_dependencies
+from entari_cli.py_info import query_packages
+
 
+def resolve_plugins(names: list[str], python: str) -> dict[str, tuple[Optional[str], Optional[str]]]:
+    """Find the config key of each plugin, and the distribution providing it if any.
 
-@register("entari_cli.plugins")
-class RemovePlugin(BasePlugin):
-    def init(self):
-        return Alconna(
-            "remove",
-            Args["name/?", str],
-            Option("--key", Args["key/", str], help_text=i18n_.commands.remove.options.key()),
-            Option("-D|--keep", help_text=i18n_.commands.remove.options.keep()),
-            meta=CommandMeta(i18n_.commands.remove.description()),
-        )
+    The candidates of every name are probed in a single query, then the first one found wins for each name.
+    """
+    requests: list[tuple[str, tuple[str, ...]]] = [("plugin_entry_points", ())]
+    for name_ in names:
+        requests += [
+            ("find_spec", (name_,)),
+            ("module_package", (name_,)),
+            ("distribution", (name_,)),
+            ("package_module", (name_,)),
+        ]
+        if not name_.count("."):
+            requests.append(("find_spec", (f"entari_plugin_{name_}",)))
+    requests = list(dict.fromkeys(requests))
+    answers = dict(zip(requests, query_packages(requests, python)))
+    entry_points = answers[("plugin_entry_points", ())] or {}
+    resolved: dict[str, tuple[Optional[str], Optional[str]]] = {}
+    for name_ in names:
+        if answers[("find_spec", (name_,))] is not None:
+            resolved[name_] = name_, answers[("module_package", (name_,))]
+        elif answers[("distribution", (name_,))]:
+            resolved[name_] = answers[("package_module", (name_,))] or name_.replace("-", "_"), name_
+        elif not name_.count(".") and answers[("find_spec", (f"entari_plugin_{name_}",))] is not None:
+            resolved[name_] = name_, f"entari-plugin-{name_}"
+        elif name_ in entry_points:
+            # a plugin declared by an installed distribution, under its entry point name
+            resolved[name_] = entry_points[name_][0].split(":", 1)[0].strip(), entry_points[name_][1]
+        else:
+            resolved[name_] = None, None
+    return resolved
 
-    def meta(self) -> PluginMetadata:
-        return PluginMetadata(
-            name="remove",
-            description=i18n_.commands.remove.description(),
-            version="0.1.0",
-        )
 
+class RemovePlugin(CommandPlugin, command="remove"):
     def dispatch(self, result: Arparma, next_: Next):
         from entari_cli.commands.setting import SelfSetting
 
         if result.find("remove"):
-            name = result.query[str]("remove.name")
-            if not name:
-                name = input(f"{Fore.BLUE}{i18n_.commands.remove.prompts.name()}{Fore.RESET}").strip()
-            name_ = name.replace("::", "arclet.entari.builtins.")
-            if name_.startswith("arclet.entari.builtins."):
-                key = name
-                if not check_package_installed(name_, local=True):
-                    return f"{Fore.RED}{i18n_.commands.remove.prompts.builtins_not_found(name=f'{Fore.BLUE}{name_}')}{Fore.RESET}\n"  # noqa: E501
-            else:
-                if check_package_installed(name_, local=True):
-                    key = result.query[str]("remove.key.key", name_)
-                    name = get_module_package(name_)
-                elif check_package_installed(name_):
-                    name = name_
-                    key = result.query[str]("remove.key.key", get_package_module(name_) or name_.replace("-", "_"))
-                elif not name_.count(".") and check_package_installed(f"entari_plugin_{name_}", local=True):
-                    name = f"entari-plugin-{name_}"
-                    key = result.query[str]("remove.key.key", name_)
-                else:
-                    key = result.query[str]("remove.key.key", name)
-                    name = None
-            cfg = EntariConfig.load(result.query[str]("cfg_path.path", None), get_project_root())
-            if key not in cfg.plugin:
-                return f"{Fore.RED}{i18n_.commands.remove.prompts.not_found(name=f'{Fore.BLUE}{name_}{Fore.RED}')}{Fore.RESET}\n"  # noqa: E501
-            cfg.plugin.pop(key, None)
-            cfg.save()
-            if not result.find("remove.keep") and not name_.count(".") and name:
+            names = list(result.query[tuple]("remove.name", ()))
+            if not names:
+                names = input(f"{Fore.BLUE}{i18n_.commands.remove.prompts.name()}{Fore.RESET}").split()
+            if len(names) > 1 and result.find("remove.key"):
+                return f"{Fore.RED}{i18n_.commands.remove.prompts.key_with_many()}{Fore.RESET}\n"
+            python = self.context.python
+            keys: list[str] = []
+            dists: list[str] = []
+            resolved = resolve_plugins([name.replace("::", "arclet.entari.builtins.") for name in names], python)
+            for name in names:
+                name_ = name.replace("::", "arclet.entari.builtins.")
+                key, dist = resolved[name_]
+                if name_.startswith("arclet.entari.builtins."):
+                    if key is None:
+                        return f"{Fore.RED}{i18n_.commands.remove.prompts.builtins_not_found(name=f'{Fore.BLUE}{name_}')}{Fore.RESET}\n"  # noqa: E501
+                    keys.append(name)
+                    continue
+                keys.append(result.query[str]("remove.key.key", key or name))
+                if dist and not name_.count(".") and dist not in dists:
+                    dists.append(dist)
+            cfg = self.context.config()
+            for name, key in zip(names, keys):
+                if key not in cfg.plugin:
+                    name_ = name.replace("::", "arclet.entari.builtins.")
+                    return f"{Fore.RED}{i18n_.commands.remove.prompts.not_found(name=f'{Fore.BLUE}{name_}{Fore.RED}')}{Fore.RESET}\n"  # noqa: E501
+            with cfg.transaction() as tx:
+                for key in keys:
+                    tx.remove(key)
+            if not result.find("remove.keep") and dists:
+                # a single package manager run for every distribution
                 uninstall_dependencies(
                     CommandLine.current().get_plugin(SelfSetting),  # type: ignore
-                    [name],
-                    get_default_python(get_project_root()),
+                    dists,
+                    python,
                 )
-            return f"{Fore.GREEN}{i18n_.commands.remove.prompts.success(name=name_)}{Fore.RESET}\n"
+            return f"{Fore.GREEN}{i18n_.commands.remove.prompts.success(name=', '.join(names))}{Fore.RESET}\n"
         return next_(None)
@@ -1,47 +1,46 @@
 from pathlib import Path
 
-from arclet.alconna import Alconna, Arparma, CommandMeta
-from clilte import BasePlugin, PluginMetadata, register
+from arclet.alconna import Arparma
 from clilte.core import Next
+from colorama import Fore
 
 from entari_cli import i18n_
-from entari_cli.process import run_process
+from entari_cli.commands import CommandPlugin
+from entari_cli.consts import WINDOWS
+from entari_cli.process import RESTART_POLICIES, RestartPolicy, Supervisor, exec_process, prefer_exec
 from entari_cli.py_info import get_default_python
 from entari_cli.template import MAIN_SCRIPT
 
 
-@register("entari_cli.plugins")
-class RunApplication(BasePlugin):
-    def init(self):
-        return Alconna(
-            "run",
-            meta=CommandMeta(i18n_.commands.run.description()),
-        )
-
-    def meta(self) -> PluginMetadata:
-        return PluginMetadata(
-            name="run",
-            description=i18n_.commands.run.description(),
-            version="0.1.0",
-        )
-
+class RunApplication(CommandPlugin, command="run"):
     def dispatch(self, result: Arparma, next_: Next):
         if result.find("run"):
+            policy = RestartPolicy(
+                mode=result.query[str]("run.restart.policy", "no"),
+                max_restarts=result.query[int]("run.max_restarts.num", 5),
+                backoff=result.query[float]("run.backoff.seconds", 1.0),
+            )
+            if policy.mode not in RESTART_POLICIES:
+                return f"{Fore.RED}{i18n_.commands.run.messages.invalid_restart(policy=policy.mode, choices=', '.join(RESTART_POLICIES))}{Fore.RESET}\n"  # noqa: E501
+            if result.find("run.exec"):
+                if policy.mode != "no":
+                    return f"{Fore.RED}{i18n_.commands.run.messages.exec_restart()}{Fore.RESET}\n"
+                use_exec = True
+            elif result.find("run.no_exec") or policy.mode != "no":
+                use_exec = False
+            else:
+                use_exec = prefer_exec()
+            # resolved once, the restarts reuse the same interpreter and script
             python_path = result.query[str]("run.python") or get_default_python(prompt=True)
             cwd = Path.cwd()
             if (cwd / "main.py").exists():
-                ret_code = run_process(
-                    python_path,
-                    Path("main.py"),
-                    cwd=cwd,
-                )
+                args = (python_path, Path("main.py"))
             else:
                 path = result.query[str]("cfg_path.path", "")
-                ret_code = run_process(
-                    python_path,
-                    "-c",
-                    MAIN_SCRIPT.format(path=f'"{path}"'),
-                    cwd=cwd,
-                )
+                args = (python_path, "-c", MAIN_SCRIPT.format(path=f'"{path}"'))
+            if use_exec and not WINDOWS:
+                exec_process(*args, cwd=cwd)
+            # Windows has no real exec, the command runs as a child there even with `--exec`
+            ret_code = Supervisor(args, cwd, policy).run()
             exit(ret_code)
         return next_(None)
@@ -0,0 +1,57 @@
+from pathlib import Path
+
+from arclet.alconna import Arparma
+from clilte.core import Next
+from colorama import Fore
+
+from entari_cli import i18n_
+from entari_cli.commands import CommandPlugin
+from entari_cli.consts import ENTARI_VERSION
+from entari_cli.installer import WHEELHOUSE_DIR
+from entari_cli.process import run_process
+from entari_cli.py_info import check_package_installed
+
+
+def project_requirements(root: Path) -> list[str]:
+    """The dependencies declared in the pyproject.toml, or those `entari init` would install."""
+    import tomlkit
+
+    toml_file = root / "pyproject.toml"
+    if toml_file.exists():
+        with toml_file.open("r", encoding="utf-8") as f:
+            deps = tomlkit.load(f).get("project", {}).get("dependencies", [])
+        if deps:
+            return [str(dep) for dep in deps]
+    return [f"arclet.entari[yaml,cron,reload,dotenv] >= {ENTARI_VERSION}"]
+
+
+class WheelhouseCommand(CommandPlugin, command="wheelhouse"):
+    def get_wheelhouse(self, result: Arparma) -> Path:
+        path = result.query[str]("wheelhouse.dir.path", "") or self.context.settings.get("install.wheelhouse")
+        return self.context.root / (path or WHEELHOUSE_DIR)
+
+    def dispatch(self, result: Arparma, next_: Next):
+        from entari_cli.commands.adapter import ADAPTERS, configured_adapters
+
+        if result.find("wheelhouse.build"):
+            python = self.context.python
+            if not check_package_installed("pip", python):
+                return f"{Fore.RED}{i18n_.commands.wheelhouse.messages.no_pip(python=python)}{Fore.RESET}\n"
+            wheelhouse = self.get_wheelhouse(result)
+            deps = project_requirements(self.context.root)
+            adapters = configured_adapters(self.context.config(readonly=True).data)
+            for key, pkg, _ in ADAPTERS.values():
+                if key in adapters and pkg not in deps:
+                    deps.append(pkg)
+            wheelhouse.mkdir(parents=True, exist_ok=True)
+            # the wheels already in the wheelhouse are reused instead of being downloaded again
+            ret_code = run_process(
+                python, "-m", "pip", "wheel", "--wheel-dir", wheelhouse, "--find-links", wheelhouse, *deps
+            )
+            if ret_code != 0:
+                return f"{Fore.RED}{i18n_.commands.wheelhouse.messages.failed()}{Fore.RESET}\n"
+            count = sum(1 for _ in wheelhouse.glob("*.whl"))
+            return f"{Fore.GREEN}{i18n_.commands.wheelhouse.messages.success(count=count, path=str(wheelhouse))}{Fore.RESET}\n"  # noqa: E501
+        if result.find("wheelhouse"):
+            return f"{i18n_.commands.wheelhouse.messages.location(path=str(self.get_wheelhouse(result)))}\n"
+        return next_(None)
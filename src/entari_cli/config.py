@@ -1,11 +1,14 @@
+import hashlib
 import json
 import os
-import re
+import pickle
 import warnings
-from collections.abc import Mapping
+from bisect import bisect_left, insort
+from collections.abc import Iterator, Mapping, MutableMapping
 from contextlib import contextmanager
 from dataclasses import dataclass, field
 from importlib import import_module
+from importlib.util import find_spec
 from io import StringIO
 from pathlib import Path
 from typing import Any, Callable, ClassVar, TypeVar, Union
@@ -13,18 +16,22 @@ from typing import Any, Callable, ClassVar, TypeVar, Union
 from colorama import Fore
 from dotenv import dotenv_values
 from ruamel.yaml import YAML
-from tarina import safe_eval
 from tomlkit import dumps, loads
 
 from entari_cli import i18n_
+from entari_cli.cache import JSONCache, cache_enabled, fingerprint, get_cache_dir
+from entari_cli.expression import substitute
 from entari_cli.utils import ask
 
-EXPR_CONTEXT_PAT = re.compile(r"['\"]?\$\{\{\s?(?P<expr>[^}\s]+)\s?\}\}['\"]?")
 T = TypeVar("T")
+SNAPSHOT_VERSION = 1
 
 
 _loaders: dict[str, Callable[[str], dict]] = {}
 _dumpers: dict[str, Callable[[dict, int, Union[str, None]], tuple[str, bool]]] = {}
+# codecs that give plain values and lose comments and formatting, preferred when the config is only read
+_fast_loaders: dict[str, Callable[[str], dict]] = {}
+_fast_dumpers: dict[str, Callable[[dict, int, Union[str, None]], tuple[str, bool]]] = {}
 
 
 class GetattrDict:
@@ -35,32 +42,85 @@ class GetattrDict:
         return self._source[item]
 
     def __getattr__(self, item):
+        if item.startswith("_"):
+            raise AttributeError(item)
         try:
             return self._source[item]
         except KeyError as e:
             raise AttributeError(f"{item} not found") from e
 
 
+class Environment(Mapping[str, str]):
+    """An immutable mapping of environment variables, recording which of them were looked up.
+
+    Each view of an environment shares its variables but has its own `consumed` set,
+    so a cache depending on the environment can be keyed on the variables its producer actually read.
+    """
+
+    def __init__(self, data: Mapping[str, str]):
+        self._data = data
+        self.consumed: set[str] = set()
+
+    def __getitem__(self, key: str) -> str:
+        self.consumed.add(key)
+        return self._data[key]
+
+    def __contains__(self, key: object) -> bool:
+        if isinstance(key, str):
+            self.consumed.add(key)
+        return key in self._data
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._data)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self._data!r})"
+
+    def view(self) -> "Environment":
+        return Environment(self._data)
+
+
+_env_cache: dict[tuple, tuple[list[tuple[Path, Union[tuple[int, int, int], None]]], Environment]] = {}
+
+
 def load_env_with_environment(
     *,
     base_files: tuple[str, ...] = (".env", ".env.local"),
     environment_key: str = "environment",
     encoding: str = "utf-8",
     use_lowercase_keys: bool = False,
-) -> dict[str, str]:
+) -> Environment:
     """
     1) 读取 .env / .env.local，拿到 environment
     2) 若 environment 有值，则再读取 .env.{environment}
     3) 最终用系统环境变量覆盖 dotenv 文件
 
     返回：合并后的 key -> value（value 可能为 None）
+
+    结果按 dotenv 文件的 stat 与系统环境变量缓存，在它们不变时直接复用
     """
+    options = (base_files, environment_key, encoding, use_lowercase_keys)
+    key = (
+        os.getcwd(),
+        options,
+        tuple(fingerprint(Path(fp).expanduser()) for fp in base_files),
+        hash(frozenset(os.environ.items())),
+    )
+    if (cached := _env_cache.get(key)) is not None:
+        extra_files, env = cached
+        if all(fingerprint(file) == fp for file, fp in extra_files):
+            return env.view()
+    read: list[Path] = []
 
     def norm(k: str) -> str:
         return k.lower() if use_lowercase_keys else k.upper()
 
     def read_one(path: str) -> dict[str, str]:
         p = Path(path).expanduser()
+        read.append(p)
         if not p.is_file():
             return {}
         raw = dotenv_values(p, encoding=encoding)
@@ -87,8 +147,226 @@ def load_env_with_environment(
             dotenv_vars.update(read_one(f".env.{env_suffix}"))
 
     # 3) 最终合并：系统环境变量覆盖 dotenv
-    final = {**dotenv_vars, **sys_env}
-    return final
+    env = Environment({**dotenv_vars, **sys_env})
+    _env_cache.clear()
+    _env_cache[key] = ([(file, fingerprint(file)) for file in read[len(base_files) :]], env)
+    return env.view()
+
+
+def _plain(value: Any) -> Any:
+    """Convert the containers and scalars of the format libraries to builtin types."""
+    if hasattr(value, "unwrap"):  # tomlkit
+        value = value.unwrap()
+    if isinstance(value, Mapping):
+        return {_plain(k): _plain(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_plain(v) for v in value]
+    for tp in (bool, str, int, float):
+        if isinstance(value, tp):
+            return tp(value)
+    return value
+
+
+class PluginTable(MutableMapping[str, Any]):
+    """The `plugins` table, kept in priority order, with `$files` fragments parsed on first access.
+
+    Entries written in the main file live in its own (round-trip) container,
+    while each fragment entry is backed by its file and loaded by the owning config when needed.
+
+    The `$priority`, `$optional` and `$disable` of each entry are indexed when the entry is set,
+    so the plugin order and the optional / disabled views are read without scanning the table.
+    Call `refresh` after changing these keys of an entry in place.
+    """
+
+    def __init__(self, config: "EntariConfig", main: MutableMapping[str, Any], fragments: dict[str, Path]):
+        self.config = config
+        self.main = main
+        self.fragments = fragments
+        """file of each fragment entry, by plugin name"""
+        self.loaded: dict[str, Any] = {}
+        self.removed: list[Path] = []
+        """files of the fragment entries deleted since the last save, removed by the owning config when it saves"""
+        self._seq = {key: i for i, key in enumerate(self)}
+        self._meta: Union[dict[str, tuple[Any, bool, bool]], None] = None
+        self._order: list[tuple[Any, int, str]] = []
+        self._names: Union[list[str], None] = None
+
+    @staticmethod
+    def decode(key: str, value: Any) -> tuple[str, Any]:
+        """Turn a `~name` (disabled) or `?name` (optional) key as written in the file into flags of the entry."""
+        if key.startswith("~"):
+            key = key[1:]
+            if "$disable" not in value or isinstance(value["$disable"], bool):
+                value["$disable"] = True
+        elif key.startswith("?"):
+            key = key[1:]
+            value["$optional"] = True
+        return key, value
+
+    @staticmethod
+    def encode(key: str, value: Any) -> tuple[str, Any]:
+        """The reverse of `decode`, moving the boolean flags of the entry back into its key."""
+        if "$disable" in value and isinstance(value["$disable"], bool):
+            key = f"~{key}" if value["$disable"] else key
+            value.pop("$disable", None)
+        if "$optional" in value:
+            key = f"?{key}" if value["$optional"] else key
+            value.pop("$optional", None)
+        return key, value
+
+    def decode_main(self) -> None:
+        """Decode the keys of the main container in place, keeping their order."""
+        for key in list(self.main.keys()):
+            if key.startswith("$"):
+                continue
+            name, value = self.decode(key, self.main.pop(key))
+            self.main[name] = value
+        self._seq = {key: i for i, key in enumerate(self)}
+        self._meta = None
+
+    def __getitem__(self, key: str):
+        if key in self.main:
+            return self.main[key]
+        if key in self.loaded:
+            return self.loaded[key]
+        if key in self.fragments:
+            value = self.loaded[key] = self.config._load_fragment(self.fragments[key])
+            return value
+        raise KeyError(key)
+
+    def __setitem__(self, key: str, value: Any):
+        if key in self.fragments:
+            self.loaded[key] = value
+        else:
+            self.main[key] = value
+        if key.startswith("$"):
+            return
+        if key not in self._seq:
+            # sequence numbers increase in insertion order, so the last one is the largest
+            self._seq[key] = next(reversed(self._seq.values()), -1) + 1
+        self.refresh(key)
+
+    def __delitem__(self, key: str):
+        if key in self.fragments:
+            self.removed.append(self.fragments.pop(key))
+            self.loaded.pop(key, None)
+            if key in self.main:
+                del self.main[key]
+        else:
+            del self.main[key]
+        self._unindex(key)
+        self._seq.pop(key, None)
+
+    def __contains__(self, key: object):
+        return key in self.main or key in self.fragments
+
+    def __iter__(self) -> Iterator[str]:
+        yield from self.main
+        yield from (key for key in self.fragments if key not in self.main)
+
+    def __len__(self):
+        return len(self.main) + sum(1 for key in self.fragments if key not in self.main)
+
+    def __ior__(self, other: Mapping[str, Any]):
+        self.update(other)
+        return self
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({dict(self.main)!r}, fragments={list(self.fragments)!r})"
+
+    def _read_meta(self, key: str) -> tuple[Any, bool, bool]:
+        if key in self.fragments and key not in self.main and key not in self.loaded:
+            path = self.fragments[key]
+            entry = _fragment_meta_cache.get(str(path.resolve()), path)
+            if entry is not None and "disabled" in entry:
+                return entry["priority"], entry["optional"], entry["disabled"]
+            value = self[key]
+            if path.as_posix() not in self.config._env_replaced:
+                _fragment_meta_cache.update(
+                    str(path.resolve()),
+                    path,
+                    priority=_plain(value.get("$priority", 16)),
+                    optional=_plain(value.get("$optional", False)),
+                    disabled=value.get("$disable") is True,
+                )
+        value = self[key]
+        return value.get("$priority", 16), value.get("$optional", False), value.get("$disable") is True
+
+    def _index(self) -> dict[str, tuple[Any, bool, bool]]:
+        if self._meta is None:
+            self._meta = {}
+            for key in self:
+                if not key.startswith("$"):
+                    self._meta[key] = self._read_meta(key)
+            self._order = sorted(
+                (priority, self._seq[key], key) for key, (priority, optional, _) in self._meta.items() if not optional
+            )
+            self._names = None
+        return self._meta
+
+    def _unindex(self, key: str) -> None:
+        if self._meta is None or key not in self._meta:
+            return
+        priority, optional, _ = self._meta.pop(key)
+        if not optional:
+            slot = (priority, self._seq[key], key)
+            del self._order[bisect_left(self._order, slot)]
+            self._names = None
+
+    def refresh(self, key: str) -> None:
+        """Re-index the entry, after its `$priority`, `$optional` or `$disable` was changed in place."""
+        if self._meta is None:
+            return
+        self._unindex(key)
+        if key not in self:
+            return
+        priority, optional, disabled = self._meta[key] = self._read_meta(key)
+        if not optional:
+            insort(self._order, (priority, self._seq[key], key))
+            self._names = None
+
+    @property
+    def names(self) -> list[str]:
+        """Names of the non-optional entries, by `$priority` and then by order of insertion."""
+        self._index()
+        if self._names is None:
+            self._names = [key for _, _, key in self._order]
+        return self._names
+
+    @property
+    def optional(self) -> frozenset[str]:
+        return frozenset(key for key, (_, optional, _) in self._index().items() if optional)
+
+    @property
+    def disabled(self) -> frozenset[str]:
+        return frozenset(key for key, (_, _, disabled) in self._index().items() if disabled)
+
+    @property
+    def prelude(self) -> frozenset[str]:
+        return frozenset(self.main.get("$prelude", ()))
+
+
+_fragment_meta_cache = JSONCache("config-fragments")
+
+
+def _restore_expressions(text: str, replaced: dict[int, tuple[str, int]], offset: int) -> str:
+    """Put the original `${{ }}` lines back in place of their evaluated values, in a single pass.
+
+    `replaced` maps the line numbers of the loaded text to the original line and the height of its value,
+    and `offset` is the number of lines the dumper prepended (e.g. a schema comment).
+    """
+    lines = text.splitlines(keepends=True)
+    out: list[str] = []
+    pos = skipped = 0
+    for i, (line, height) in sorted(replaced.items()):
+        start = i + offset + skipped
+        out.extend(lines[pos:start])
+        out.append(line)
+        extra = max(height - 2, 0)
+        pos = start + 1 + extra
+        skipped += extra
+    out.extend(lines[pos:])
+    return "".join(out)
 
 
 def check_env(file: Path):
@@ -119,41 +397,50 @@ def check_env(file: Path):
 class EntariConfig:
     path: Path
     basic: dict[str, Any] = field(init=False)
-    plugin: dict[str, dict] = field(init=False)
+    plugin: PluginTable = field(init=False)
     prelude_plugin: list[str] = field(init=False)
     plugin_extra_files: list[str] = field(init=False)
     save_flag: bool = field(default=False)
-    env_vars: dict[str, str] = field(default_factory=dict)
+    env_vars: Mapping[str, str] = field(default_factory=dict)
+    readonly: bool = field(default=False)
+    """load for reading only, from the snapshot cache or with the fast codecs, giving plain values"""
     _origin_data: dict[str, Any] = field(init=False)
     _env_replaced: dict[str, dict[int, tuple[str, int]]] = field(default_factory=dict, init=False)
+    _documents: dict[str, Any] = field(default_factory=dict, init=False)
+    """the documents as loaded from each file, reused when the file is saved"""
+    _sources: list[Path] = field(default_factory=list, init=False)
+    _expr_env: Environment = field(default_factory=lambda: Environment(os.environ), init=False)
+    """the variables available to `${{ env.X }}` expressions"""
+    _from_snapshot: bool = field(default=False, init=False)
+    _fragment_states: dict[str, Any] = field(default_factory=dict, init=False)
+    """plain copies of the `$files` fragments as last loaded or saved, to tell which ones were changed"""
+    _transactions: int = field(default=0, init=False)
+    _pending_save: Union[tuple[Any, int, bool], None] = field(default=None, init=False)
+    """the arguments of a `save()` deferred to the end of the outermost transaction"""
 
     instance: ClassVar["EntariConfig"]
 
     def loader(self, path: Path):
+        self._sources.append(path)
+        self._env_replaced.pop(path.as_posix(), None)
+        self._documents.pop(path.as_posix(), None)
         if not path.exists():
             return {}
         end = path.suffix.split(".")[-1]
-        if end in _loaders:
-            ctx = {"env": GetattrDict(os.environ)}
+        if load := get_loader(end, round_trip=not self.readonly):
+            ctx = {"env": GetattrDict(self._expr_env)}
 
             with path.open("r", encoding="utf-8") as f:
-                lines = f.readlines()
-            for i, line in enumerate(lines):
-
-                def handle(m: re.Match[str]):
-                    expr = m.group("expr")
-                    ans = safe_eval(expr, ctx)
-                    self._env_replaced.setdefault(path.as_posix(), {})[i] = (line, len(ans.splitlines()))
-                    return ans
-
-                lines[i] = EXPR_CONTEXT_PAT.sub(handle, line)
-            text = "".join(lines)
-            return _loaders[end](text)
+                text, replaced = substitute(f.read(), ctx)
+            if replaced:
+                self._env_replaced[path.as_posix()] = replaced
+            doc = self._documents[path.as_posix()] = load(text)
+            return doc
 
         raise ValueError(f"Unsupported file format: {path.suffix}")
 
     def dumper(self, path: Path, save_path: Path, data: dict, indent: int, apply_schema: bool):
-        origin = self.loader(path) if path.exists() else data
+        origin = self._documents.get(path.as_posix(), data)
         if "entari" in origin:
             origin["entari"] = data
         else:
@@ -162,17 +449,18 @@ class EntariConfig:
         schema_file = None
         if apply_schema:
             schema_file = f"{save_path.stem}.schema.json"
-        if end in _dumpers:
-            ans, applied = _dumpers[end](origin, indent, schema_file)
-            if self._env_replaced:
-                lines = ans.splitlines(keepends=True)
-                for i, (line, height) in self._env_replaced[path.as_posix()].items():
-                    lines[i + applied] = line
-                    for _ in range(height - 2):
-                        lines.pop(i + applied + 1)
-                ans = "".join(lines)
-            with save_path.open("w", encoding="utf-8") as f:
-                f.write(ans)
+        if dump := get_dumper(end):
+            ans, applied = dump(origin, indent, schema_file)
+            if replaced := self._env_replaced.get(path.as_posix()):
+                ans = _restore_expressions(ans, replaced, applied)
+            try:
+                unchanged = save_path.read_text(encoding="utf-8") == ans
+            except (OSError, UnicodeDecodeError):
+                unchanged = False
+            # leave the file and its mtime alone, so that config watchers are not triggered
+            if not unchanged:
+                with save_path.open("w", encoding="utf-8") as f:
+                    f.write(ans)
             return
         raise ValueError(f"Unsupported file format: {save_path.suffix}")
 
@@ -186,55 +474,129 @@ class EntariConfig:
 
     @property
     def prelude_plugin_names(self) -> list[str]:
-        return [name for name in self.plugin_names if name in self.prelude_plugin]
+        prelude = self.plugin.prelude
+        return [name for name in self.plugin_names if name in prelude]
 
     @property
     def plugin_names(self) -> list[str]:
-        slots = [
-            (name, self.plugin[name].get("$priority", 16))
-            for name in self.plugin
-            if not name.startswith("$") and not self.plugin[name].get("$optional", False)
-        ]
-        slots.sort(key=lambda x: x[1])
-        return [name for name, _ in slots]
+        return list(self.plugin.names)
+
+    @property
+    def consumed_env(self) -> frozenset[str]:
+        """The environment variables read by the `${{ }}` expressions of the loaded files."""
+        return frozenset(self._expr_env.consumed)
+
+    @property
+    def snapshot_file(self) -> Path:
+        # relative `$files` entries are resolved against the working directory
+        key = f"{self.path.resolve()}\0{Path.cwd()}"
+        return get_cache_dir() / "config" / f"{hashlib.sha1(key.encode()).hexdigest()}.pickle"
+
+    def _load_snapshot(self) -> bool:
+        if not cache_enabled():
+            return False
+        try:
+            with self.snapshot_file.open("rb") as f:
+                snapshot = pickle.load(f)
+            if snapshot["version"] != SNAPSHOT_VERSION:
+                return False
+            if any(fingerprint(file) != fp for file, fp in snapshot["sources"].items()):
+                return False
+            if any(os.environ.get(name) != value for name, value in snapshot["env"].items()):
+                return False
+            data = snapshot["data"]
+        except Exception:
+            return False
+        self._origin_data = data
+        self.basic = data["basic"]
+        self.plugin = PluginTable(self, data["plugins"], {})
+        self.plugin_extra_files = self.plugin.get("$files", [])  # type: ignore
+        self.prelude_plugin = self.plugin.get("$prelude", [])  # type: ignore
+        self._from_snapshot = True
+        return True
+
+    def _save_snapshot(self, dirs: list[Path]):
+        if not cache_enabled():
+            return
+        data = _plain(self._origin_data)
+        data["plugins"] = _plain(self.plugin)
+        snapshot = {
+            "version": SNAPSHOT_VERSION,
+            # directories are included so that adding a fragment file invalidates the snapshot
+            "sources": {str(file): fingerprint(file) for file in [*self._sources, *dirs]},
+            "env": {name: os.environ.get(name) for name in self.consumed_env},
+            "data": data,
+        }
+        try:
+            self.snapshot_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.snapshot_file.with_suffix(".tmp")
+            with tmp.open("wb") as f:
+                pickle.dump(snapshot, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, self.snapshot_file)
+        except (OSError, pickle.PicklingError, TypeError):
+            pass
 
     def reload(self):
         if self.save_flag:
             self.save_flag = False
             return False
+        if self.readonly and self._load_snapshot():
+            return True
+        self._sources.clear()
+        self._expr_env = Environment(os.environ)
+        self._from_snapshot = False
         data = self.loader(self.path)
         if "entari" in data:
             data = data["entari"]
         self.basic = data.setdefault("basic", {})
         self._origin_data = data
-        self.plugin = data.setdefault("plugins", {})
-        self.plugin_extra_files: list[str] = self.plugin.get("$files", [])  # type: ignore
-        self.prelude_plugin = self.plugin.get("$prelude", [])  # type: ignore
-        for key in list(self.plugin.keys()):
-            if key.startswith("$"):
-                continue
-            value = self.plugin.pop(key)
-            if key.startswith("~"):
-                key = key[1:]
-                if "$disable" not in value or isinstance(value["$disable"], bool):
-                    value["$disable"] = True
-            elif key.startswith("?"):
-                key = key[1:]
-                value["$optional"] = True
-            self.plugin[key] = value
+        main = data.setdefault("plugins", {})
+        self.plugin_extra_files: list[str] = main.get("$files", [])  # type: ignore
+        self.prelude_plugin = main.get("$prelude", [])  # type: ignore
+        fragments = {}
+        dirs = []
         for file in self.plugin_extra_files:
             path = Path(file)
             if not path.exists():
                 raise FileNotFoundError(file)
             if path.is_dir():
+                dirs.append(path)
                 for _path in path.iterdir():
                     if not _path.is_file() or _path.name.endswith(".schema.json"):
                         continue
-                    self.plugin[_path.stem] = self.loader(_path)
-            elif path.name.endswith(".schema.json"):
-                self.plugin[path.stem] = self.loader(path)
+                    fragments[_path.stem] = _path
+            elif not path.name.endswith(".schema.json"):
+                fragments[path.stem] = path
+        self.plugin = PluginTable(self, main, fragments)
+        self.plugin.decode_main()
+        if self.readonly:
+            self._save_snapshot(dirs)
         return True
 
+    def _load_fragment(self, path: Path):
+        value = self.loader(path)
+        self._fragment_states[path.as_posix()] = _plain(value)
+        return value
+
+    def _dump_fragment(self, path: Path, value: dict, indent: int, apply_schema: bool):
+        state = _plain(value)
+        if not apply_schema and state == self._fragment_states.get(path.as_posix()):
+            return
+        self.dumper(path, path, value, indent, apply_schema)
+        self._fragment_states[path.as_posix()] = state
+
+    def _remove_fragments(self):
+        """Delete the files of the fragment entries removed from the table, and their `$files` entries if listed."""
+        files = self.plugin.main.get("$files")
+        for path in self.plugin.removed:
+            if path.exists():
+                path.unlink()
+            self._fragment_states.pop(path.as_posix(), None)
+            if files:
+                for file in [file for file in files if Path(file) == path]:
+                    files.remove(file)
+        self.plugin.removed.clear()
+
     def dump(self, indent: int = 2, apply_schema: bool = False):
         basic = self._origin_data.setdefault("basic", {})
         if "log" not in basic and ("log_level" in basic or "log_ignores" in basic):
@@ -247,35 +609,65 @@ class EntariConfig:
         def _clean(value: dict):
             return {k: v for k, v in value.items() if k not in {"$path", "$static"}}
 
-        if self.plugin_extra_files:
-            for file in self.plugin_extra_files:
-                path = Path(file)
-                if path.is_file() and not path.name.endswith(".schema.json"):
-                    self.dumper(path, path, _clean(self.plugin.pop(path.stem)), indent, apply_schema)
-                else:
-                    for _path in path.iterdir():
-                        if _path.is_file() and not _path.name.endswith(".schema.json"):
-                            self.dumper(_path, _path, _clean(self.plugin.pop(_path.stem)), indent, apply_schema)
-        for key in list(self.plugin.keys()):
+        if apply_schema:
+            # every fragment gets the schema, so load those that were never accessed
+            for key, path in self.plugin.fragments.items():
+                if key not in self.plugin.loaded:
+                    self.plugin.loaded[key] = self._load_fragment(path)
+        # fragments that were never loaded cannot have been changed
+        for key, value in self.plugin.loaded.items():
+            if key in self.plugin.fragments:
+                self._dump_fragment(self.plugin.fragments[key], _clean(value), indent, apply_schema)
+        self._remove_fragments()
+        main = self.plugin.main
+        for key in list(main.keys()):
             if key.startswith("$"):
                 continue
-            value = self.plugin.pop(key)
-            if "$disable" in value and isinstance(value["$disable"], bool):
-                key = f"~{key}" if value["$disable"] else key
-                value.pop("$disable", None)
-            if "$optional" in value:
-                key = f"?{key}" if value["$optional"] else key
-                value.pop("$optional", None)
-            self.plugin[key] = _clean(value)
+            key, value = PluginTable.encode(key, main.pop(key))
+            main[key] = _clean(value)
         return self._origin_data
 
     def save(self, path: Union[str, os.PathLike[str], None] = None, indent: int = 2, apply_schema: bool = False):
+        if self.readonly:
+            raise RuntimeError("configuration loaded with readonly=True cannot be saved")
+        if self._transactions:
+            self._pending_save = (path, indent, apply_schema)
+            return
         self.save_flag = True
         self.dumper(self.path, Path(path or self.path), self.dump(indent, apply_schema), indent, apply_schema)
+        # `dump` encoded the flags of the entries into their keys, bring them back
+        self.plugin.decode_main()
+
+    @contextmanager
+    def transaction(self):
+        """Gather the changes made in the block and save them once, when the outermost transaction exits.
+
+        `save()` calls made in the block are deferred to the end of the transaction.
+        If the block raises, nothing is saved, but the changes stay in memory (call `reload` to drop them).
+        """
+        self._transactions += 1
+        try:
+            yield ConfigTransaction(self)
+        except BaseException:
+            self._transactions -= 1
+            if not self._transactions:
+                self._pending_save = None
+            raise
+        self._transactions -= 1
+        if not self._transactions:
+            pending, self._pending_save = self._pending_save, None
+            self.save(*(pending or ()))
 
     @classmethod
-    def load(cls, path: Union[str, os.PathLike[str], None] = None, cwd: Union[Path, None] = None) -> "EntariConfig":
-        env_vars = load_env_with_environment()
+    def load(
+        cls,
+        path: Union[str, os.PathLike[str], None] = None,
+        cwd: Union[Path, None] = None,
+        env_vars: Union[Mapping[str, str], None] = None,
+        readonly: bool = False,
+    ) -> "EntariConfig":
+        if env_vars is None:
+            env_vars = load_env_with_environment()
         cwd = cwd or Path.cwd()
         if not path:
             if "ENTARI_CONFIG_FILE" in env_vars:
@@ -306,36 +698,217 @@ class EntariConfig:
             return cls(_path, env_vars=env_vars)
         if not _path.is_file():
             raise ValueError(f"{_path} is not a file")
-        return cls(_path, env_vars=env_vars)
+        return cls(_path, env_vars=env_vars, readonly=readonly)
+
+
+class ConfigTransaction:
+    """The operations that can be batched in `EntariConfig.transaction`."""
+
+    OPERATIONS = (
+        "add",
+        "remove",
+        "set",
+        "unset",
+        "enable",
+        "disable",
+        "optional",
+        "add_adapter",
+        "remove_adapter",
+    )
+
+    def __init__(self, config: EntariConfig):
+        self.config = config
+        self.count = 0
+        """number of operations that changed the configuration"""
+
+    def add(
+        self,
+        name: str,
+        config: Union[Mapping[str, Any], None] = None,
+        *,
+        disabled: bool = False,
+        optional: bool = False,
+        priority: Union[int, None] = None,
+    ):
+        """Add a plugin, replacing its configuration if it already exists."""
+        entry = dict(config or {})
+        if disabled:
+            entry["$disable"] = True
+        if optional:
+            entry["$optional"] = True
+        if priority is not None:
+            entry["$priority"] = priority
+        self.config.plugin[name] = entry
+        self.count += 1
+
+    def remove(self, name: str) -> bool:
+        if name not in self.config.plugin:
+            return False
+        del self.config.plugin[name]
+        self.count += 1
+        return True
+
+    def _flag(self, name: str, flag: str, value: bool):
+        if name not in self.config.plugin:
+            raise KeyError(name)
+        entry = self.config.plugin[name]
+        if (entry.get(flag) is True) == value:
+            return
+        if value:
+            entry[flag] = True
+        else:
+            entry.pop(flag, None)
+        self.config.plugin.refresh(name)
+        self.count += 1
+
+    def enable(self, name: str):
+        self._flag(name, "$disable", False)
+
+    def disable(self, name: str):
+        self._flag(name, "$disable", True)
+
+    def optional(self, name: str, value: bool = True):
+        self._flag(name, "$optional", value)
 
+    def _locate(self, key: str, create: bool) -> tuple[Union[str, None], Union[MutableMapping, None], str]:
+        """Find the plugin (if any) and the table holding the last part of a dotted key.
 
-def register_loader(*ext: str):
-    """Register a loader for a specific file extension."""
+        Keys under `plugins` go through the plugin table, so that `$files` fragments are found
+        and the plugin order stays indexed.
+        """
+        *parents, last = key.split(".")
+        plugin = None
+        current: Any = self.config.data
+        if parents and parents[0] == "plugins":
+            current = self.config.plugin
+            if len(parents) > 1:
+                plugin, parents = parents[1], parents[2:]
+                if plugin not in self.config.plugin:
+                    if not create:
+                        return plugin, None, last
+                    self.config.plugin[plugin] = {}
+                current = self.config.plugin[plugin]
+            else:
+                parents = []
+        for part in parents:
+            if current is None:
+                break
+            current = current.setdefault(part, {}) if create else current.get(part)
+        return plugin, current, last
+
+    def set(self, key: str, value: Any):
+        """Set a dotted key of the configuration, e.g. `basic.log.level`, or `plugins.echo.prefix`."""
+        plugin, table, last = self._locate(key, create=True)
+        if last in table and table[last] == value:  # type: ignore
+            return
+        table[last] = value  # type: ignore
+        if plugin is not None:
+            self.config.plugin.refresh(plugin)
+        self.count += 1
+
+    def unset(self, key: str) -> bool:
+        plugin, table, last = self._locate(key, create=False)
+        if table is None or last not in table:
+            return False
+        del table[last]
+        if plugin is not None:
+            self.config.plugin.refresh(plugin)
+        self.count += 1
+        return True
+
+    def add_adapter(self, path: str, config: Union[Mapping[str, Any], None] = None) -> bool:
+        """Add an adapter by its `$path` (like `@console`), unless it is already configured."""
+        adapters = self.config.data.setdefault("adapters", [])
+        if any(adapter["$path"].replace("satori.adapters.", "@") == path for adapter in adapters):
+            return False
+        adapters.append({"$path": path, **(config or {})})
+        self.count += 1
+        return True
+
+    def remove_adapter(self, path: str) -> bool:
+        adapters = self.config.data.get("adapters", [])
+        kept = [adapter for adapter in adapters if adapter["$path"].replace("satori.adapters.", "@") != path]
+        if len(kept) == len(adapters):
+            return False
+        self.config.data["adapters"] = kept
+        self.count += 1
+        return True
+
+    def apply(self, operation: Mapping[str, Any]):
+        """Apply an operation given as a mapping, e.g. `{"op": "add", "name": "echo", "priority": 1}`."""
+        args = dict(operation)
+        op = args.pop("op", None)
+        if op not in self.OPERATIONS:
+            raise ValueError(f"unknown operation {op!r}, expected one of {', '.join(self.OPERATIONS)}")
+        getattr(self, op)(**args)
+
+
+def _importable(*names: str) -> Callable[[], bool]:
+    """A capability probe checking that one of the modules can be imported."""
+
+    def probe():
+        return any(find_spec(name) is not None for name in names)
+
+    return probe
+
+
+def register_loader(*ext: str, round_trip: bool = True, probe: Union[Callable[[], bool], None] = None):
+    """Register a loader for a specific file extension.
+
+    A loader that does not keep comments and formatting should pass `round_trip=False`,
+    it is then used only when the config is loaded for reading.
+    The loader is skipped if `probe` tells its backend is not available.
+    """
 
     def decorator(func: Callable[[str], dict]):
+        if probe is not None and not probe():
+            return func
         for e in ext:
-            _loaders[e] = func
+            (_loaders if round_trip else _fast_loaders)[e] = func
         return func
 
     return decorator
 
 
-def register_dumper(*ext: str):
-    """Register a dumper for a specific file extension."""
+def register_dumper(*ext: str, round_trip: bool = True, probe: Union[Callable[[], bool], None] = None):
+    """Register a dumper for a specific file extension, see `register_loader` for the options."""
 
     def decorator(func: Callable[[dict, int, Union[str, None]], tuple[str, bool]]):
+        if probe is not None and not probe():
+            return func
         for e in ext:
-            _dumpers[e] = func
+            (_dumpers if round_trip else _fast_dumpers)[e] = func
         return func
 
     return decorator
 
 
+def get_loader(ext: str, round_trip: bool = True) -> Union[Callable[[str], dict], None]:
+    if not round_trip and ext in _fast_loaders:
+        return _fast_loaders[ext]
+    return _loaders.get(ext) or _fast_loaders.get(ext)
+
+
+def get_dumper(
+    ext: str, round_trip: bool = True
+) -> Union[Callable[[dict, int, Union[str, None]], tuple[str, bool]], None]:
+    if not round_trip and ext in _fast_dumpers:
+        return _fast_dumpers[ext]
+    return _dumpers.get(ext) or _fast_dumpers.get(ext)
+
+
 @register_loader("json")
 def json_loader(text: str) -> dict:
     return json.loads(text)
 
 
+@register_loader("json", round_trip=False, probe=_importable("orjson"))
+def json_fast_loader(text: str) -> dict:
+    import orjson
+
+    return orjson.loads(text)
+
+
 @register_dumper("json")
 def json_dumper(origin: dict, indent: int, schema_file: Union[str, None] = None):
     schema_applied = False
@@ -353,6 +926,12 @@ def yaml_loader(text: str) -> dict:
     return yaml.load(StringIO(text))
 
 
+@register_loader("yaml", "yml", round_trip=False)
+def yaml_fast_loader(text: str) -> dict:
+    # uses the libyaml based C loader when ruamel.yaml.clib is installed
+    return YAML(typ="safe").load(text)
+
+
 @register_dumper("yaml", "yml")
 def yaml_dumper(origin: dict, indent: int, schema_file: Union[str, None] = None):
     yaml = YAML()
@@ -385,6 +964,16 @@ def toml_loader(text: str) -> dict[str, Any]:
     return loads(text)
 
 
+@register_loader("toml", round_trip=False, probe=_importable("tomllib", "tomli"))
+def toml_fast_loader(text: str) -> dict[str, Any]:
+    try:
+        import tomllib
+    except ImportError:
+        import tomli as tomllib
+
+    return tomllib.loads(text)
+
+
 @register_dumper("toml")
 def toml_dumper(origin: dict[str, Any], indent: int = 4, schema_file: Union[str, None] = None) -> tuple[str, bool]:
     """
@@ -0,0 +1,114 @@
+"""Per-invocation facts about the project the CLI runs in."""
+
+from __future__ import annotations
+
+from functools import cached_property
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import tomlkit
+
+    from entari_cli.config import EntariConfig, Environment
+    from entari_cli.setting import SettingStore
+
+
+def find_project_root(cwd: Path) -> Path:
+    for parent in [cwd, *cwd.parents]:
+        if (parent / "pyproject.toml").exists() or (parent / "setup.py").exists():
+            return parent
+    return cwd
+
+
+class ProjectContext:
+    """Lazily resolved and memoized facts about the project of the current CLI run.
+
+    A context is created once per invocation and shared by the command plugins,
+    so the project root, venv, interpreter, settings, environment variables
+    and configuration are each resolved at most once.
+    """
+
+    def __init__(self, cwd: Path | None = None, config_path: str | None = None):
+        self.cwd = cwd or Path.cwd()
+        self.config_path = config_path
+        self._configs: dict[tuple[str | None, bool], EntariConfig] = {}
+        self._settings: dict[bool, tomlkit.TOMLDocument | None] = {}
+
+    @cached_property
+    def root(self) -> Path:
+        """The root directory of the project, i.e. the nearest one with a pyproject.toml or setup.py"""
+        return find_project_root(self.cwd)
+
+    @cached_property
+    def venv(self) -> tuple[Path, Path]:
+        """The interpreter and the directory of the in-project venv, which may not exist yet."""
+        from entari_cli.venv import get_venv_python
+
+        return get_venv_python(self.root)
+
+    @cached_property
+    def python(self) -> str:
+        """The interpreter the project runs with."""
+        venv_python, _ = self.venv
+        if venv_python.exists():
+            return str(venv_python)
+        from entari_cli.py_info import get_default_python
+
+        return get_default_python(self.root)
+
+    @cached_property
+    def env_vars(self) -> Environment:
+        from entari_cli.config import load_env_with_environment
+
+        return load_env_with_environment()
+
+    def config(self, path: str | None = None, readonly: bool = False) -> EntariConfig:
+        """Load the configuration file once, by default from the `--config` option or the project root.
+
+        A `readonly` configuration may come from the snapshot cache or the fast codecs, and cannot be saved.
+        """
+        path = path or self.config_path
+        if (path, False) in self._configs:
+            return self._configs[path, False]
+        if (path, readonly) not in self._configs:
+            from entari_cli.config import EntariConfig
+
+            self._configs[path, readonly] = EntariConfig.load(
+                path, self.root, env_vars=self.env_vars, readonly=readonly
+            )
+        return self._configs[path, readonly]
+
+    def setting_file(self, local: bool) -> Path:
+        if local:
+            return self.root / ".entari_cli.toml"
+        from platformdirs import user_config_path
+
+        return user_config_path("entari-cli", appauthor=False) / "config.toml"
+
+    @cached_property
+    def settings(self) -> SettingStore:
+        """The merged, read-only view of the local and global settings."""
+        from entari_cli.setting import SettingStore
+
+        return SettingStore(self.setting_file(True), self.setting_file(False))
+
+    def setting(self, local: bool) -> tomlkit.TOMLDocument | None:
+        """The local or global setting file as a tomlkit document for editing, None if it does not exist."""
+        if local not in self._settings:
+            import tomlkit
+
+            setting_file = self.setting_file(local)
+            if not setting_file.exists():
+                self._settings[local] = None
+            else:
+                with setting_file.open("r", encoding="utf-8") as f:
+                    self._settings[local] = tomlkit.load(f)
+        return self._settings[local]
+
+    def forget_setting(self, local: bool) -> None:
+        self._settings.pop(local, None)
+
+    def refresh_venv(self) -> None:
+        """Forget the venv and interpreter, e.g. after a venv has been created."""
+        self.__dict__.pop("venv", None)
+        self.__dict__.pop("python", None)
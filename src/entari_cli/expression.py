@@ -0,0 +1,110 @@
+"""Evaluation of the `${{ }}` expressions in configuration files.
+
+An expression is a route like `env.HOME` or `env["KEY"]`, interpreted with the semantics of `tarina.safe_eval`.
+Each distinct route is compiled once into a chain of accessors, shared by all the files loaded in the process.
+"""
+
+from __future__ import annotations
+
+import re
+from collections.abc import Mapping
+from functools import cache
+from operator import attrgetter, itemgetter
+from typing import Any, Callable
+
+EXPR_CONTEXT_PAT = re.compile(r"['\"]?\$\{\{\s?(?P<expr>[^}\s]+)\s?\}\}['\"]?")
+# same as EXPR_CONTEXT_PAT, but never matching across lines when applied to a whole text
+EXPR_TEXT_PAT = re.compile(r"['\"]?\$\{\{[^\S\n]?(?P<expr>[^}\s]+)[^\S\n]?\}\}['\"]?")
+ROUTE_PAT = re.compile(r"\.|(\[.+?\])|(\(.*?\))")
+
+
+def _unquote(value: str) -> str:
+    if value[0] in ("'", '"') and value[-1] in ("'", '"'):
+        return value[1:-1]
+    return value
+
+
+def _compile_call(item: str) -> Callable[[Any], Any]:
+    if not item:
+        return lambda res: res()
+    args = []
+    kwargs = {}
+    for part in item.split(","):
+        part = part.strip()
+        if re.match(".+=.+", part):
+            k, v = part.split("=")
+            kwargs[k] = _unquote(v)
+        else:
+            args.append(_unquote(part))
+    return lambda res: res(*args, **kwargs)
+
+
+def _compile_item(item: str) -> Callable[[Any], Any]:
+    if item[0] in ("'", '"') and item[-1] in ("'", '"'):
+        return itemgetter(item[1:-1])
+    if ":" in item:
+        return itemgetter(slice(*(int(x) if x else None for x in item.split(":"))))
+    try:
+        return itemgetter(int(item))
+    except ValueError:
+        return itemgetter(item)
+
+
+@cache
+def compile_expr(route: str) -> Callable[[Mapping[str, Any]], Any]:
+    """Compile the route into a function evaluating it against a context."""
+    parts = ROUTE_PAT.split(route)
+    key = parts[0]
+    steps: list[Callable[[Any], Any]] = []
+    for part in parts[1:]:
+        if not part:
+            continue
+        if part.startswith("_"):
+            raise ValueError(route)
+        if part.startswith("[") and part.endswith("]"):
+            steps.append(_compile_item(part[1:-1]))
+        elif part.startswith("(") and part.endswith(")"):
+            steps.append(_compile_call(part[1:-1]))
+        else:
+            steps.append(attrgetter(part))
+
+    def evaluate(ctx: Mapping[str, Any]):
+        if key not in ctx:
+            raise NameError(key)
+        res = ctx[key]
+        for step in steps:
+            res = step(res)
+        return res
+
+    return evaluate
+
+
+def substitute(text: str, ctx: Mapping[str, Any]) -> tuple[str, dict[int, tuple[str, int]]]:
+    """Replace every expression of the text by its value, in a single pass.
+
+    Returns the new text, and for each line with an expression, its line number mapped to
+    the original line and the number of lines of the (last) value put in it.
+    """
+    replaced: dict[int, tuple[str, int]] = {}
+    if "${{" not in text:
+        return text, replaced
+    values: dict[str, str] = {}
+    pieces: list[str] = []
+    pos = lineno = line_pos = 0
+    for m in EXPR_TEXT_PAT.finditer(text):
+        start = m.start()
+        lineno += text.count("\n", line_pos, start)
+        line_pos = start
+        expr = m.group("expr")
+        if expr not in values:
+            values[expr] = compile_expr(expr)(ctx)
+        ans = values[expr]
+        line_start = text.rfind("\n", 0, start) + 1
+        line_end = text.find("\n", start)
+        line = text[line_start:] if line_end < 0 else text[line_start : line_end + 1]
+        replaced[lineno] = (line, len(ans.splitlines()))
+        pieces.append(text[pos:start])
+        pieces.append(ans)
+        pos = m.end()
+    pieces.append(text[pos:])
+    return "".join(pieces), replaced
@@ -0,0 +1,102 @@
+"""The findpython side of the interpreter lookup, only imported by the commands that search for interpreters."""
+
+from __future__ import annotations
+
+import json
+import subprocess
+from collections.abc import Iterable
+from pathlib import Path
+from typing import Any
+
+from findpython import ALL_PROVIDERS, BaseProvider, Finder, PythonVersion
+from findpython.python import GET_VERSION_TIMEOUT
+from packaging.version import Version
+
+from entari_cli.py_info import probe_interpreter
+from entari_cli.venv import get_in_project_venv
+
+# everything `PythonVersion` asks the interpreter, in a single run
+PROBE_SCRIPT = """\
+import json, platform, sys, sysconfig
+print(json.dumps({
+    "version": platform.python_version(),
+    "implementation": platform.python_implementation().lower(),
+    "architecture": platform.architecture()[0],
+    "interpreter": sys.executable,
+    "freethreaded": bool(sysconfig.get_config_var("Py_GIL_DISABLED")),
+}))
+"""
+
+
+class CachedPythonVersion(PythonVersion):
+    """A `PythonVersion` probing all its fields at once, kept in the on-disk interpreter cache
+    (see `entari_cli.py_info.probe_interpreter`).
+    """
+
+    def _run_probe(self) -> dict[str, Any]:
+        return json.loads(
+            subprocess.run(
+                [str(self.executable), "-Ic", PROBE_SCRIPT],
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                timeout=GET_VERSION_TIMEOUT,
+                check=True,
+                text=True,
+            ).stdout
+        )
+
+    def _probe(self) -> dict[str, Any]:
+        return probe_interpreter(self.executable, self._run_probe)
+
+    @property
+    def implementation(self) -> str:
+        return self._probe()["implementation"]
+
+    def _get_version(self) -> Version:
+        # dev builds report versions like `3.11.0+`, which packaging rejects
+        return Version(self._probe()["version"].split("+")[0])
+
+    def _get_architecture(self) -> str:
+        return self._probe()["architecture"]
+
+    def _get_interpreter(self) -> str:
+        return self._probe()["interpreter"]
+
+    def _get_freethreaded(self) -> bool:
+        return self._probe()["freethreaded"]
+
+
+class VenvProvider(BaseProvider):
+    """A Python provider for project venv pythons"""
+
+    version_maker = CachedPythonVersion
+
+    def __init__(self, cwd: Path) -> None:
+        self.cwd = cwd
+
+    @classmethod
+    def create(cls):
+        return None
+
+    def find_pythons(self) -> Iterable[PythonVersion]:
+        in_project_venv = get_in_project_venv(self.cwd)
+        if in_project_venv is not None:
+            yield self.version_maker(
+                in_project_venv.interpreter, _interpreter=in_project_venv.interpreter, keep_symlink=True
+            )
+
+
+def _cached_provider(provider_class: type[BaseProvider]) -> type[BaseProvider]:
+    # `version_maker` is read from the class by the providers' classmethods, so it is overridden in a subclass
+    return type(provider_class.__name__, (provider_class,), {"version_maker": CachedPythonVersion})
+
+
+def get_python_finder(cwd: Path, search_venv: bool = True) -> Finder:
+    finder = Finder(resolve_symlinks=True, selected_providers=[])
+    for provider_class in ALL_PROVIDERS.values():
+        provider = _cached_provider(provider_class).create()
+        if provider is not None:
+            finder.add_provider(provider)
+    if search_venv:
+        finder.add_provider(VenvProvider(cwd), 0)
+    return finder
@@ -33,6 +33,7 @@ class EntariCliCommandsAddPrompts:
     builtins_not_found: LangItem = LangItem("entari_cli", "commands.add.prompts.builtins_not_found")
     failed: LangItem = LangItem("entari_cli", "commands.add.prompts.failed")
     success: LangItem = LangItem("entari_cli", "commands.add.prompts.success")
+    key_with_many: LangItem = LangItem("entari_cli", "commands.add.prompts.key_with_many")
 
 
 class EntariCliCommandsAdd:
@@ -93,6 +94,7 @@ class EntariCliCommandsRemovePrompts:
     success: LangItem = LangItem("entari_cli", "commands.remove.prompts.success")
     builtins_not_found: LangItem = LangItem("entari_cli", "commands.remove.prompts.builtins_not_found")
     not_found: LangItem = LangItem("entari_cli", "commands.remove.prompts.not_found")
+    key_with_many: LangItem = LangItem("entari_cli", "commands.remove.prompts.key_with_many")
 
 
 class EntariCliCommandsRemove:
@@ -103,11 +105,22 @@ class EntariCliCommandsRemove:
 
 class EntariCliCommandsRunOptions:
     python: LangItem = LangItem("entari_cli", "commands.run.options.python")
+    exec: LangItem = LangItem("entari_cli", "commands.run.options.exec")
+    no_exec: LangItem = LangItem("entari_cli", "commands.run.options.no_exec")
+    restart: LangItem = LangItem("entari_cli", "commands.run.options.restart")
+    max_restarts: LangItem = LangItem("entari_cli", "commands.run.options.max_restarts")
+    backoff: LangItem = LangItem("entari_cli", "commands.run.options.backoff")
+
+
+class EntariCliCommandsRunMessages:
+    invalid_restart: LangItem = LangItem("entari_cli", "commands.run.messages.invalid_restart")
+    exec_restart: LangItem = LangItem("entari_cli", "commands.run.messages.exec_restart")
 
 
 class EntariCliCommandsRun:
     description: LangItem = LangItem("entari_cli", "commands.run.description")
     options = EntariCliCommandsRunOptions
+    messages = EntariCliCommandsRunMessages
 
 
 class EntariCliCommandsGenerateMessages:
@@ -169,6 +182,8 @@ class EntariCliCommandsAdapterOptions:
     list: LangItem = LangItem("entari_cli", "commands.adapter.options.list")
     add: LangItem = LangItem("entari_cli", "commands.adapter.options.add")
     remove: LangItem = LangItem("entari_cli", "commands.adapter.options.remove")
+    all: LangItem = LangItem("entari_cli", "commands.adapter.options.all")
+    adapters: LangItem = LangItem("entari_cli", "commands.adapter.options.adapters")
 
 
 class EntariCliCommandsAdapterMessages:
@@ -179,6 +194,7 @@ class EntariCliCommandsAdapterMessages:
     add_success: LangItem = LangItem("entari_cli", "commands.adapter.messages.add_success")
     remove_success: LangItem = LangItem("entari_cli", "commands.adapter.messages.remove_success")
     server_not_installed: LangItem = LangItem("entari_cli", "commands.adapter.messages.server_not_installed")
+    unknown_adapter: LangItem = LangItem("entari_cli", "commands.adapter.messages.unknown_adapter")
 
 
 class EntariCliCommandsAdapterPrompts:
@@ -195,6 +211,50 @@ class EntariCliCommandsAdapter:
     prompts = EntariCliCommandsAdapterPrompts
 
 
+class EntariCliCommandsCacheOptions:
+    clear: LangItem = LangItem("entari_cli", "commands.cache.options.clear")
+
+
+class EntariCliCommandsCacheMessages:
+    cleared: LangItem = LangItem("entari_cli", "commands.cache.messages.cleared")
+    location: LangItem = LangItem("entari_cli", "commands.cache.messages.location")
+
+
+class EntariCliCommandsCache:
+    description: LangItem = LangItem("entari_cli", "commands.cache.description")
+    options = EntariCliCommandsCacheOptions
+    messages = EntariCliCommandsCacheMessages
+
+
+class EntariCliCommandsApplyMessages:
+    success: LangItem = LangItem("entari_cli", "commands.apply.messages.success")
+    invalid: LangItem = LangItem("entari_cli", "commands.apply.messages.invalid")
+
+
+class EntariCliCommandsApply:
+    description: LangItem = LangItem("entari_cli", "commands.apply.description")
+    file: LangItem = LangItem("entari_cli", "commands.apply.file")
+    messages = EntariCliCommandsApplyMessages
+
+
+class EntariCliCommandsWheelhouseOptions:
+    build: LangItem = LangItem("entari_cli", "commands.wheelhouse.options.build")
+    dir: LangItem = LangItem("entari_cli", "commands.wheelhouse.options.dir")
+
+
+class EntariCliCommandsWheelhouseMessages:
+    location: LangItem = LangItem("entari_cli", "commands.wheelhouse.messages.location")
+    success: LangItem = LangItem("entari_cli", "commands.wheelhouse.messages.success")
+    failed: LangItem = LangItem("entari_cli", "commands.wheelhouse.messages.failed")
+    no_pip: LangItem = LangItem("entari_cli", "commands.wheelhouse.messages.no_pip")
+
+
+class EntariCliCommandsWheelhouse:
+    description: LangItem = LangItem("entari_cli", "commands.wheelhouse.description")
+    options = EntariCliCommandsWheelhouseOptions
+    messages = EntariCliCommandsWheelhouseMessages
+
+
 class EntariCliCommands:
     init = EntariCliCommandsInit
     add = EntariCliCommandsAdd
@@ -206,6 +266,11 @@ class EntariCliCommands:
     config_path: LangItem = LangItem("entari_cli", "commands.config_path")
     setting = EntariCliCommandsSetting
     adapter = EntariCliCommandsAdapter
+    no_cache: LangItem = LangItem("entari_cli", "commands.no_cache")
+    cache = EntariCliCommandsCache
+    apply = EntariCliCommandsApply
+    offline: LangItem = LangItem("entari_cli", "commands.offline")
+    wheelhouse = EntariCliCommandsWheelhouse
 
 
 class EntariCliErrors:
@@ -230,12 +295,20 @@ class EntariCliProject:
     no_python_found: LangItem = LangItem("entari_cli", "project.no_python_found")
     invalid_selection: LangItem = LangItem("entari_cli", "project.invalid_selection")
     fallback_pip: LangItem = LangItem("entari_cli", "project.fallback_pip")
+    offline_fallback: LangItem = LangItem("entari_cli", "project.offline_fallback")
+    wheelhouse_missing: LangItem = LangItem("entari_cli", "project.wheelhouse_missing")
 
 
 class EntariCliVenv:
     use: LangItem = LangItem("entari_cli", "venv.use")
     create: LangItem = LangItem("entari_cli", "venv.create")
     ask_create: LangItem = LangItem("entari_cli", "venv.ask_create")
+    clone: LangItem = LangItem("entari_cli", "venv.clone")
+
+
+class EntariCliProcess:
+    restarting: LangItem = LangItem("entari_cli", "process.restarting")
+    crash_loop: LangItem = LangItem("entari_cli", "process.crash_loop")
 
 
 class EntariCli:
@@ -244,6 +317,7 @@ class EntariCli:
     config = EntariCliConfig
     project = EntariCliProject
     venv = EntariCliVenv
+    process = EntariCliProcess
 
 
 class Lang(LangModel):
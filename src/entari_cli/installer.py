@@ -0,0 +1,275 @@
+"""Backends of the pip-style installs of `install_dependencies` / `uninstall_dependencies`.
+
+`uv pip` is preferred whenever uv can be found, as it starts and resolves much faster than `python -m pip`;
+the arguments meant for pip are translated to their uv equivalents.
+
+Installs can also be made from a local wheelhouse only (see `entari wheelhouse build`),
+when the `install.wheelhouse` setting is set, or with `--offline` / the `ENTARI_CLI_OFFLINE` environment variable.
+"""
+
+from __future__ import annotations
+
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+from collections.abc import Iterable, Sequence
+from importlib.util import find_spec
+from pathlib import Path
+
+from entari_cli.cache import expired, get_cache_dir
+from entari_cli.process import run_process
+
+OFFLINE_ENV = "ENTARI_CLI_OFFLINE"
+WHEELHOUSE_DIR = "wheelhouse"
+# the package managers able to install from a wheelhouse
+WHEELHOUSE_PMS = ("pip", "uv")
+
+_offline = os.getenv(OFFLINE_ENV, "").strip().lower() in {"1", "true", "yes", "on"}
+
+# pip options uv has no use for, mapped to whether they take a value
+UV_DROPPED_OPTIONS = {
+    "-y": False,
+    "--yes": False,
+    "--disable-pip-version-check": False,
+    "--no-python-version-warning": False,
+    "--no-warn-script-location": False,
+    "--no-warn-conflicts": False,
+    "--no-input": False,
+    "--progress-bar": True,
+    "--root-user-action": True,
+    "--timeout": True,
+    "--retries": True,
+}
+UV_RENAMED_OPTIONS = {
+    "--no-cache-dir": "--no-cache",
+    "--trusted-host": "--allow-insecure-host",
+}
+# pip install options that also apply to downloading the requirements, mapped to whether they take a value
+DOWNLOAD_OPTIONS = {
+    "-i": True,
+    "--index-url": True,
+    "--extra-index-url": True,
+    "--no-index": False,
+    "-f": True,
+    "--find-links": True,
+    "-c": True,
+    "--constraint": True,
+    "--pre": False,
+    "--only-binary": True,
+    "--no-binary": True,
+    "--prefer-binary": False,
+    "--no-deps": False,
+    "--trusted-host": True,
+    "--proxy": True,
+    "--cert": True,
+    "--client-cert": True,
+    "--timeout": True,
+    "--retries": True,
+    "--no-cache-dir": False,
+}
+# pip install options without effect on what is downloaded, mapped to whether they take a value
+INSTALL_ONLY_OPTIONS = {
+    "-U": False,
+    "--upgrade": False,
+    "--upgrade-strategy": True,
+    "--force-reinstall": False,
+    "-I": False,
+    "--ignore-installed": False,
+    "--user": False,
+    "--no-compile": False,
+    "--compile": False,
+    "--no-warn-script-location": False,
+    "--no-warn-conflicts": False,
+    "--break-system-packages": False,
+    "--root-user-action": True,
+    "--disable-pip-version-check": False,
+    "--progress-bar": True,
+    "-q": False,
+    "--quiet": False,
+    "-v": False,
+    "--verbose": False,
+    "-y": False,
+    "--yes": False,
+    "--no-input": False,
+}
+
+
+class PipBackend:
+    """Runs the operations with `python -m pip` in the target interpreter."""
+
+    name = "pip"
+
+    def __init__(self, python: str):
+        self.python = python
+
+    def translate(self, args: Iterable[str]) -> list[str]:
+        return list(args)
+
+    def command(self, operation: str) -> list[str]:
+        return [self.python, "-m", "pip", operation]
+
+    def install(self, deps: Sequence[str], args: Sequence[str] = ()) -> int:
+        return run_process(*self.command("install"), *self.translate(args), *deps)
+
+    def uninstall(self, deps: Sequence[str], args: Sequence[str] = ()) -> int:
+        return run_process(*self.command("uninstall"), "-y", *self.translate(args), *deps)
+
+
+class UvPipBackend(PipBackend):
+    """Runs the operations with `uv pip`, targeting the interpreter with `--python`."""
+
+    name = "uv pip"
+
+    def __init__(self, python: str, uv: str):
+        super().__init__(python)
+        self.uv = uv
+
+    def translate(self, args: Iterable[str]) -> list[str]:
+        result = []
+        skip = False
+        for arg in args:
+            if skip:
+                skip = False
+                continue
+            option, eq, value = arg.partition("=")
+            if option in UV_DROPPED_OPTIONS:
+                skip = UV_DROPPED_OPTIONS[option] and not eq
+                continue
+            if option in UV_RENAMED_OPTIONS:
+                arg = f"{UV_RENAMED_OPTIONS[option]}{eq}{value}"
+            result.append(arg)
+        return result
+
+    def command(self, operation: str) -> list[str]:
+        return [self.uv, "pip", operation, "--python", self.python]
+
+    def uninstall(self, deps: Sequence[str], args: Sequence[str] = ()) -> int:
+        # uv never asks for confirmation, so pip's `-y` has no equivalent
+        return run_process(*self.command("uninstall"), *self.translate(args), *deps)
+
+
+def find_uv() -> str | None:
+    """Find the uv executable, on PATH or from the `uv` package of the current interpreter."""
+    if uv := shutil.which("uv"):
+        return uv
+    if find_spec("uv") is not None:
+        from uv import find_uv_bin
+
+        try:
+            return find_uv_bin()
+        except FileNotFoundError:
+            return None
+    return None
+
+
+def get_pip_backend(python: str, preferred: str = "") -> PipBackend:
+    """Choose the backend for the interpreter: `uv pip` when uv is found, unless `pip` is preferred."""
+    if preferred != "pip" and (uv := find_uv()):
+        return UvPipBackend(python, uv)
+    return PipBackend(python)
+
+
+def download_args(args: Iterable[str]) -> list[str] | None:
+    """Keep the pip install arguments that also apply to a download;
+    None if some of them are not known pip options, as what they mean for the install cannot be told."""
+    result = []
+    iterator = iter(args)
+    for arg in iterator:
+        option, eq, _ = arg.partition("=")
+        if option in DOWNLOAD_OPTIONS:
+            result.append(arg)
+            if DOWNLOAD_OPTIONS[option] and not eq:
+                result.append(next(iterator, ""))
+        elif option in INSTALL_ONLY_OPTIONS:
+            if INSTALL_ONLY_OPTIONS[option] and not eq:
+                next(iterator, None)
+        else:
+            return None
+    return result
+
+
+def offline_enabled() -> bool:
+    return _offline
+
+
+def enable_offline() -> None:
+    global _offline
+
+    _offline = True
+
+
+def resolve_wheelhouse(root: Path, setting: str = "") -> Path | None:
+    """The wheelhouse to install from, relative to the project root; None to install from the index."""
+    if setting:
+        return root / setting
+    if _offline:
+        return root / WHEELHOUSE_DIR
+    return None
+
+
+def wheelhouse_args(wheelhouse: Path) -> tuple[str, ...]:
+    return "--no-index", "--find-links", str(wheelhouse)
+
+
+class Prefetch:
+    """Fetches the distributions of the requirements in a background thread, with the given interpreter
+    (e.g. while the user answers the prompts and the venv is created), so that the install does not have
+    to wait for the downloads.
+
+    With pip they are downloaded into a directory the install can find them in, where they are kept
+    as long as the venv templates; with uv they are installed into a throwaway target, which fills the uv cache
+    the install then reads from. The `args` must be pip install arguments that apply to a download
+    (see `download_args`).
+    """
+
+    def __init__(self, deps: Sequence[str], args: Sequence[str] = (), uv: str | None = None):
+        self.deps = list(deps)
+        self.args = list(args)
+        self.uv = uv
+        self.directory = get_cache_dir() / "wheels"
+        self._thread: threading.Thread | None = None
+        self._retcode: int | None = None
+
+    def _fetch(self, cmd: list[str]) -> int:
+        try:
+            return subprocess.run(
+                cmd, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+            ).returncode
+        except OSError:
+            return -1
+
+    def _prune(self) -> None:
+        for file in self.directory.iterdir():
+            try:
+                if file.is_file() and expired(file.stat().st_mtime):
+                    file.unlink()
+            except OSError:
+                pass
+
+    def _run(self, python: str) -> None:
+        if self.uv is None:
+            self._prune()
+            cmd = [python, "-m", "pip", "download", "--dest", str(self.directory), *self.args, *self.deps]
+            self._retcode = self._fetch(cmd)
+            return
+        backend = UvPipBackend(python, self.uv)
+        with tempfile.TemporaryDirectory(prefix="entari-prefetch-") as target:
+            self._retcode = self._fetch(
+                [*backend.command("install"), "--target", target, *backend.translate(self.args), *self.deps]
+            )
+
+    def start(self, python: str) -> None:
+        if self.uv is None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+        self._thread = threading.Thread(target=self._run, args=(python,), name="entari-prefetch", daemon=True)
+        self._thread.start()
+
+    def wait(self) -> list[Path]:
+        """Wait for the downloads, returning the directories to find them in;
+        none if they failed or never started, or if they went into the uv cache."""
+        if self._thread is None:
+            return []
+        self._thread.join()
+        return [self.directory] if self._retcode == 0 and self.uv is None else []
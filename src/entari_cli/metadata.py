@@ -0,0 +1,367 @@
+"""Read the package metadata of a virtual environment directly from its site-packages.
+
+This answers the questions `py_info` used to ask the target interpreter
+(is a distribution installed, which module does it provide, ...) without spawning it,
+by parsing `*.dist-info` directories and emulating the path based import system.
+Environments whose import system cannot be emulated this way (conda, system site-packages,
+`.pth` files executing code) are not supported, and the caller should fall back to
+asking the interpreter itself.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import sys
+from dataclasses import dataclass
+from functools import cached_property
+from pathlib import Path
+from typing import Any
+
+from entari_cli.cache import JSONCache
+from entari_cli.consts import WINDOWS
+from entari_cli.venv import VirtualEnv
+
+NAME_NORMALIZE_PAT = re.compile(r"[-_.]+")
+SOURCE_SUFFIXES = (".py", ".pyc")
+EXTENSION_SUFFIXES = (".pyd",) if WINDOWS else (".so",)
+# `.pth` files installed by setuptools and virtualenv, whose code does not affect the import paths
+KNOWN_PTH_FILES = {"distutils-precedence.pth", "_virtualenv.pth"}
+PLUGIN_ENTRY_POINT_GROUPS = ("arclet.entari", "entari")
+
+
+def normalize_name(name: str) -> str:
+    return NAME_NORMALIZE_PAT.sub("-", name).lower()
+
+
+def _read_lines(path: Path) -> list[str]:
+    try:
+        return path.read_text(encoding="utf-8").splitlines()
+    except (OSError, UnicodeDecodeError):
+        return []
+
+
+@dataclass(frozen=True)
+class ModuleLocation:
+    name: str
+    origin: Path | None
+    """the file of the module, None for namespace packages and built-in modules"""
+    search_locations: tuple[Path, ...] = ()
+    """the directories of the package, empty for plain modules"""
+
+
+class Distribution:
+    """A distribution installed as a `*.dist-info` (or legacy `*.egg-info`) directory."""
+
+    def __init__(self, path: Path):
+        self.path = path
+
+    @property
+    def site(self) -> Path:
+        return self.path.parent
+
+    @cached_property
+    def metadata(self) -> dict[str, str]:
+        headers: dict[str, str] = {}
+        filename = "PKG-INFO" if self.path.suffix == ".egg-info" else "METADATA"
+        for line in _read_lines(self.path / filename):
+            if not line:
+                break
+            key, sep, value = line.partition(":")
+            if sep and not key.startswith((" ", "\t")):
+                headers.setdefault(key.strip().lower(), value.strip())
+        return headers
+
+    @property
+    def name(self) -> str:
+        return self.metadata.get("name") or self.path.name.split("-", 1)[0]
+
+    @property
+    def version(self) -> str | None:
+        return self.metadata.get("version")
+
+    @cached_property
+    def files(self) -> list[str]:
+        """Installed files, as posix paths relative to the site-packages directory."""
+        if self.path.suffix == ".egg-info":
+            files = []
+            for line in _read_lines(self.path / "installed-files.txt"):
+                if line:
+                    files.append(Path(os.path.normpath(self.path / line)).relative_to(self.site).as_posix())
+            return files
+        return [line.split(",", 1)[0] for line in _read_lines(self.path / "RECORD") if line]
+
+    @cached_property
+    def top_level(self) -> list[str]:
+        return [line.strip() for line in _read_lines(self.path / "top_level.txt") if line.strip()]
+
+    @cached_property
+    def entry_points(self) -> dict[str, dict[str, str]]:
+        groups: dict[str, dict[str, str]] = {}
+        group = None
+        for line in _read_lines(self.path / "entry_points.txt"):
+            line = line.strip()
+            if not line or line.startswith(("#", ";")):
+                continue
+            if line.startswith("[") and line.endswith("]"):
+                group = groups.setdefault(line[1:-1].strip(), {})
+            elif group is not None and "=" in line:
+                name, value = line.split("=", 1)
+                group[name.strip()] = value.strip()
+        return groups
+
+    def importable_names(self, suffixes: tuple[str, ...] = SOURCE_SUFFIXES) -> list[str]:
+        """Module names that can be imported from the installed files, shortest first."""
+        importable = set()
+        for file in self.files:
+            if (name := module_name(file, suffixes)) is not None:
+                importable.add(name)
+        return sorted(importable, key=len)
+
+
+def module_name(file: str, suffixes: tuple[str, ...] = SOURCE_SUFFIXES + EXTENSION_SUFFIXES) -> str | None:
+    """Get the module name of a file relative to an import path, if it is a module."""
+    path = Path(file)
+    if path.suffix not in suffixes or "__pycache__" in path.parts:
+        return None
+    stem = path.name.split(".", 1)[0]
+    parts = path.parts[:-1] if stem == "__init__" else (*path.parts[:-1], stem)
+    if parts and all(part.isidentifier() for part in parts):
+        return ".".join(parts)
+    return None
+
+
+def _stdlib_paths(home: str, site: Path) -> list[Path]:
+    """The standard library directories of the base interpreter whose executable is in `home`,
+    named as in the venv's site-packages path (e.g. `lib/python3.12` and its `lib-dynload`)."""
+    if not home:
+        return []
+    if WINDOWS:
+        candidates = [Path(home) / "Lib", Path(home) / "DLLs"]
+    else:
+        candidates = []
+        for prefix in (Path(home).parent, Path(home).resolve().parent):
+            for lib in ("lib", "lib64"):
+                stdlib = prefix / lib / site.parent.name
+                candidates += [stdlib, stdlib / "lib-dynload"]
+    return [path for path in dict.fromkeys(candidates) if path.is_dir()]
+
+
+_index_cache = JSONCache("site-packages")
+
+
+class SitePackages:
+    """The import paths of a virtual environment, read without running its interpreter."""
+
+    def __init__(self, paths: list[Path], extra_paths: list[Path], stdlib_paths: list[Path] = ()):  # type: ignore
+        self.paths = paths
+        self.extra_paths = extra_paths
+        self.stdlib_paths = list(stdlib_paths)
+        self._listings: dict[Path, tuple[int, set[str]]] = {}
+        self._distributions: tuple[tuple[int, ...], dict[str, Distribution]] | None = None
+        self._index: tuple[tuple[int, ...], dict[str, dict[str, Any]], dict[str, str]] | None = None
+
+    @classmethod
+    def from_python(cls, python: str | Path) -> SitePackages | None:
+        """Locate the site-packages of the venv the interpreter belongs to,
+        or return None if it cannot be inspected without running the interpreter.
+        """
+        venv = VirtualEnv.from_interpreter(Path(python))
+        if venv is None or venv.is_conda or venv.include_system_site_packages:
+            return None
+        if WINDOWS:
+            candidates = [venv.root / "Lib" / "site-packages"]
+        else:
+            candidates = sorted(venv.root.glob("lib/*/site-packages"))
+            if len(candidates) > 1 and (
+                version := venv.venv_config.get("version_info", venv.venv_config.get("version"))
+            ):
+                major_minor = ".".join(version.split(".")[:2])
+                candidates = [path for path in candidates if path.parent.name.endswith(major_minor)]
+        paths = [path for path in candidates if path.is_dir()]
+        if len(paths) != 1:
+            return None
+        stdlib_paths = _stdlib_paths(venv.venv_config.get("home", ""), paths[0])
+        if not stdlib_paths:
+            return None
+        extra_paths = []
+        for pth in sorted(paths[0].glob("*.pth")):
+            for line in _read_lines(pth):
+                line = line.strip()
+                if not line or line.startswith("#"):
+                    continue
+                if line.startswith(("import ", "import\t")):
+                    if pth.name in KNOWN_PTH_FILES:
+                        continue
+                    return None
+                extra = (paths[0] / line).resolve()
+                if extra.is_dir() and extra not in extra_paths:
+                    extra_paths.append(extra)
+        return cls(paths, extra_paths, stdlib_paths)
+
+    @property
+    def distributions(self) -> dict[str, Distribution]:
+        """Installed distributions by normalized name, rescanned when a site-packages directory changes."""
+        key = tuple(self._mtime(site) for site in self.paths)
+        if self._distributions is not None and self._distributions[0] == key:
+            return self._distributions[1]
+        dists: dict[str, Distribution] = {}
+        for site in self.paths:
+            for entry in sorted(self._listdir(site)):
+                if entry.endswith((".dist-info", ".egg-info")):
+                    dists.setdefault(normalize_name(entry.split("-", 1)[0]), Distribution(site / entry))
+        self._distributions = (key, dists)
+        return dists
+
+    def distribution(self, name: str) -> Distribution | None:
+        return self.distributions.get(normalize_name(name))
+
+    def _build_index(self, site: Path) -> dict[str, Any]:
+        packages: dict[str, dict[str, Any]] = {}
+        modules: dict[str, str] = {}
+        for key, dist in self.distributions.items():
+            if dist.site != site:
+                continue
+            packages[key] = {
+                "name": dist.name,
+                "version": dist.version,
+                "modules": dist.importable_names(),
+                "entry_points": {
+                    group: dist.entry_points[group] for group in PLUGIN_ENTRY_POINT_GROUPS if group in dist.entry_points
+                },
+            }
+            for name in dist.importable_names(SOURCE_SUFFIXES + EXTENSION_SUFFIXES):
+                modules.setdefault(name, key)
+        return {"packages": packages, "modules": modules}
+
+    @property
+    def index(self) -> tuple[dict[str, dict[str, Any]], dict[str, str]]:
+        """The installed distributions by normalized name, and the distribution providing each module.
+
+        The index of each site-packages directory is persisted in the cache directory,
+        and rebuilt only when the directory itself changes (i.e. something was installed or removed).
+        """
+        key = tuple(self._mtime(site) for site in self.paths)
+        if self._index is None or self._index[0] != key:
+            packages: dict[str, dict[str, Any]] = {}
+            modules: dict[str, str] = {}
+            for site in self.paths:
+                entry = _index_cache.get(str(site), site)
+                if entry is None:
+                    entry = self._build_index(site)
+                    _index_cache.update(str(site), site, **entry)
+                for name, info in entry["packages"].items():
+                    packages.setdefault(name, info)
+                for name, dist in entry["modules"].items():
+                    modules.setdefault(name, dist)
+            self._index = (key, packages, modules)
+        return self._index[1], self._index[2]
+
+    def package_info(self, package: str) -> dict[str, Any] | None:
+        return self.index[0].get(normalize_name(package))
+
+    def package_version(self, package: str) -> str | None:
+        info = self.package_info(package)
+        return info["version"] if info is not None else None
+
+    def plugin_entry_points(self) -> dict[str, tuple[str, str]]:
+        """Entry points of the `arclet.entari` and `entari` groups over all distributions,
+        as the object they refer to and the name of the distribution declaring them."""
+        result: dict[str, tuple[str, str]] = {}
+        for info in self.index[0].values():
+            for group in PLUGIN_ENTRY_POINT_GROUPS:
+                for name, value in info["entry_points"].get(group, {}).items():
+                    result.setdefault(name, (value, info["name"]))
+        return result
+
+    @staticmethod
+    def _mtime(path: Path) -> int:
+        try:
+            return path.stat().st_mtime_ns
+        except OSError:
+            return -1
+
+    def _listdir(self, path: Path) -> set[str]:
+        mtime = self._mtime(path)
+        cached = self._listings.get(path)
+        if cached is None or cached[0] != mtime:
+            try:
+                cached = self._listings[path] = (mtime, set(os.listdir(path)))
+            except OSError:
+                cached = self._listings[path] = (mtime, set())
+        return cached[1]
+
+    def _find_in(self, name: str, part: str, paths: list[Path]) -> ModuleLocation | None:
+        namespace: list[Path] = []
+        for base in paths:
+            entries = self._listdir(base)
+            if part in entries and (base / part).is_dir():
+                pkg = base / part
+                for init in self._listdir(pkg):
+                    if init.split(".", 1)[0] == "__init__" and init.endswith(SOURCE_SUFFIXES + EXTENSION_SUFFIXES):
+                        return ModuleLocation(name, pkg / init, (pkg,))
+                namespace.append(pkg)
+            for suffix in SOURCE_SUFFIXES:
+                if f"{part}{suffix}" in entries:
+                    return ModuleLocation(name, base / f"{part}{suffix}")
+            for entry in entries:
+                if entry.startswith(f"{part}.") and entry.endswith(EXTENSION_SUFFIXES) and entry.count(".") <= 2:
+                    return ModuleLocation(name, base / entry)
+        if namespace:
+            return ModuleLocation(name, None, tuple(namespace))
+        return None
+
+    def find_spec(self, module: str, cwd: Path | None = None) -> ModuleLocation | None:
+        """Emulate `importlib.util.find_spec` for an interpreter started in the given directory.
+
+        The modules built into the interpreter are taken to be those built into the running one,
+        they hardly differ between versions and builds.
+        """
+        if module in sys.builtin_module_names:
+            return ModuleLocation(module, None)
+        paths = [cwd or Path.cwd(), *self.stdlib_paths, *self.paths, *self.extra_paths]
+        found = None
+        parts = module.split(".")
+        for i, part in enumerate(parts):
+            if not part.isidentifier():
+                return None
+            found = self._find_in(".".join(parts[: i + 1]), part, paths)
+            if found is None:
+                return None
+            paths = list(found.search_locations)
+        return found
+
+    def package_module(self, package: str, cwd: Path | None = None) -> str | None:
+        info = self.package_info(package)
+        if info is None:
+            return None
+        for name in info["modules"]:
+            spec = self.find_spec(name, cwd)
+            if spec is not None:
+                return spec.name if spec.origin is not None else None
+        return None
+
+    def module_package(self, module: str, cwd: Path | None = None) -> str | None:
+        spec = self.find_spec(module, cwd)
+        if spec is None or spec.origin is None:
+            return None
+        packages, modules = self.index
+        for site in self.paths:
+            try:
+                relative_path = spec.origin.relative_to(site).as_posix()
+            except ValueError:
+                continue
+            name = module_name(relative_path)
+            if name is not None and name in modules:
+                return packages[modules[name]]["name"]
+        return None
+
+
+_site_packages_cache: dict[str, SitePackages | None] = {}
+
+
+def get_site_packages(python: str | Path) -> SitePackages | None:
+    key = str(python)
+    if key not in _site_packages_cache:
+        _site_packages_cache[key] = SitePackages.from_python(python)
+    return _site_packages_cache[key]
@@ -1,9 +1,124 @@
+import asyncio
 import os
+import random
 import signal
 import subprocess
 import sys
+import threading
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable, Iterable, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Union
+from typing import NoReturn, Optional, TypeVar, Union
+
+from colorama import Fore
+
+from entari_cli import i18n_
+from entari_cli.cache import flush_caches
+from entari_cli.worker import close_workers
+
+T = TypeVar("T")
+DEFAULT_CONCURRENCY = 8
+EXEC_ENV = "ENTARI_CLI_EXEC"
+RESTART_POLICIES = ("no", "on-failure", "always")
+
+
+@dataclass(frozen=True)
+class RestartPolicy:
+    """When and how often a supervised process is restarted.
+
+    More than `max_restarts` restarts within `window` seconds is a crash loop, on which the supervisor gives up.
+    The delay before a restart doubles from `backoff` up to `max_backoff`, with jitter,
+    and starts over once the process has stayed up for a whole window.
+    """
+
+    mode: str = "no"
+    max_restarts: int = 5
+    backoff: float = 1.0
+    max_backoff: float = 60.0
+    window: float = 60.0
+    grace: float = 10.0
+
+    def should_restart(self, retcode: int) -> bool:
+        return self.mode == "always" or (self.mode == "on-failure" and retcode != 0)
+
+    def delay(self, failures: int) -> float:
+        """The jittered delay before the restart following the given number of quick failures in a row."""
+        return min(self.backoff * 2 ** (failures - 1), self.max_backoff) * random.uniform(0.5, 1.0)
+
+
+class Supervisor:
+    """Runs a command as a child process, restarting it according to the policy.
+
+    SIGINT and SIGTERM are forwarded to the child and end the supervision;
+    the child is killed if it is still alive after the grace period, or at once on a second signal.
+    """
+
+    def __init__(
+        self,
+        args: Sequence[Union[str, bytes, "os.PathLike[str]", "os.PathLike[bytes]"]],
+        cwd: Union[Path, None] = None,
+        policy: Optional[RestartPolicy] = None,
+    ):
+        self.args = args
+        self.cwd = cwd
+        self.policy = policy or RestartPolicy()
+        self._proc: Optional[subprocess.Popen] = None
+        self._stopping = threading.Event()
+        self._killer: Optional[threading.Timer] = None
+
+    def _kill(self) -> None:
+        if self._proc is not None and self._proc.poll() is None:
+            self._proc.kill()
+
+    def _on_signal(self, signum: int, frame) -> None:
+        if self._stopping.is_set():
+            self._kill()
+            return
+        self._stopping.set()
+        if self._proc is None or self._proc.poll() is not None:
+            return
+        if sys.platform == "win32" and signum == signal.SIGINT:
+            signum = signal.SIGTERM
+        self._proc.send_signal(signum)
+        self._killer = threading.Timer(self.policy.grace, self._kill)
+        self._killer.daemon = True
+        self._killer.start()
+
+    def run(self) -> int:
+        """Run the command until it should not be restarted anymore, and return its last exit code."""
+        handle_term = signal.signal(signal.SIGTERM, self._on_signal)
+        handle_int = signal.signal(signal.SIGINT, self._on_signal)
+        policy = self.policy
+        restarts: deque[float] = deque()
+        failures = 0
+        try:
+            while True:
+                started = time.monotonic()
+                self._proc = subprocess.Popen(self.args, cwd=self.cwd, bufsize=0, close_fds=False)
+                retcode = self._proc.wait()
+                if self._stopping.is_set() or not policy.should_restart(retcode):
+                    return retcode
+                now = time.monotonic()
+                failures = 1 if now - started >= policy.window else failures + 1
+                while restarts and now - restarts[0] > policy.window:
+                    restarts.popleft()
+                if len(restarts) >= policy.max_restarts:
+                    message = i18n_.process.crash_loop(count=len(restarts), window=f"{policy.window:g}")
+                    print(f"{Fore.RED}{message}{Fore.RESET}")
+                    return retcode
+                restarts.append(now)
+                delay = policy.delay(failures)
+                print(f"{Fore.YELLOW}{i18n_.process.restarting(code=retcode, delay=f'{delay:.1f}')}{Fore.RESET}")
+                if self._stopping.wait(delay):
+                    return retcode
+        finally:
+            if self._killer is not None:
+                self._killer.cancel()
+            signal.signal(signal.SIGTERM, handle_term)
+            signal.signal(signal.SIGINT, handle_int)
 
 
 def run_process(
@@ -11,16 +126,157 @@ def run_process(
     cwd: Union[Path, None] = None,
 ) -> int:
     """Run command in a subprocess and return the exit code."""
+    return Supervisor(args, cwd).run()
 
-    def forward_signal(signum: int, frame) -> None:
-        if sys.platform == "win32" and signum == signal.SIGINT:
-            signum = signal.SIGTERM
-        p.send_signal(signum)
-
-    handle_term = signal.signal(signal.SIGTERM, forward_signal)
-    handle_int = signal.signal(signal.SIGINT, forward_signal)
-    p = subprocess.Popen(args, cwd=cwd, bufsize=0, close_fds=False)
-    retcode = p.wait()
-    signal.signal(signal.SIGTERM, handle_term)
-    signal.signal(signal.SIGINT, handle_int)
-    return retcode
+
+def prefer_exec() -> bool:
+    """Whether to hand the process over rather than spawn a child: set by the `ENTARI_CLI_EXEC` environment variable,
+    otherwise only when running as PID 1, i.e. as the entrypoint of a container."""
+    if sys.platform == "win32":
+        return False
+    value = os.getenv(EXEC_ENV, "").strip().lower()
+    if value:
+        return value in {"1", "true", "yes", "on"}
+    return os.getpid() == 1
+
+
+def exec_process(
+    *args: Union[str, "os.PathLike[str]"],
+    cwd: Union[Path, None] = None,
+) -> NoReturn:
+    """Replace the current process by the command, which then receives the signals directly.
+    The command is searched for on PATH like a shell would.
+
+    Only for POSIX: Windows has no real exec, run the command with `run_process` there instead.
+    """
+    if cwd is not None:
+        os.chdir(cwd)
+    # nothing runs after exec: close the introspection workers and write the caches back now
+    close_workers()
+    flush_caches()
+    sys.stdout.flush()
+    sys.stderr.flush()
+    os.execvp(args[0], [os.fspath(arg) for arg in args])
+
+
+@dataclass(frozen=True)
+class ProcessResult:
+    """The outcome of a captured subprocess; `returncode` is None if it could not start or timed out."""
+
+    args: tuple[str, ...]
+    returncode: Optional[int]
+    stdout: str = ""
+    stderr: str = ""
+    timed_out: bool = False
+
+    @property
+    def ok(self) -> bool:
+        return self.returncode == 0
+
+
+async def capture_process_async(
+    *args: str,
+    cwd: Union[Path, None] = None,
+    timeout: Optional[float] = None,
+    limit: Optional[asyncio.Semaphore] = None,
+) -> ProcessResult:
+    """Run the command with its output captured, once the `limit` lets it, killing it after `timeout` seconds."""
+    limit = limit or asyncio.Semaphore(1)
+    async with limit:
+        try:
+            proc = await asyncio.create_subprocess_exec(
+                *args, cwd=cwd, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.PIPE
+            )
+        except OSError as e:
+            return ProcessResult(args, None, stderr=str(e))
+        try:
+            stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout)
+        except asyncio.CancelledError:
+            # no longer needed, e.g. another candidate of `first_process_async` answered first
+            proc.kill()
+            await proc.wait()
+            raise
+        except asyncio.TimeoutError:
+            proc.kill()
+            stdout, stderr = await proc.communicate()
+            return ProcessResult(
+                args, None, stdout.decode("utf-8", "replace"), stderr.decode("utf-8", "replace"), timed_out=True
+            )
+        return ProcessResult(
+            args, proc.returncode, stdout.decode("utf-8", "replace"), stderr.decode("utf-8", "replace")
+        )
+
+
+async def gather_processes_async(
+    commands: Iterable[Sequence[str]],
+    cwd: Union[Path, None] = None,
+    timeout: Optional[float] = None,
+    concurrency: int = DEFAULT_CONCURRENCY,
+) -> list[ProcessResult]:
+    """Run the independent commands concurrently, at most `concurrency` at a time; the results are in order."""
+    limit = asyncio.Semaphore(concurrency)
+    return list(
+        await asyncio.gather(*(capture_process_async(*cmd, cwd=cwd, timeout=timeout, limit=limit) for cmd in commands))
+    )
+
+
+async def first_process_async(
+    commands: Iterable[Sequence[str]],
+    accept: Optional[Callable[[ProcessResult], bool]] = None,
+    cwd: Union[Path, None] = None,
+    timeout: Optional[float] = None,
+) -> Optional[ProcessResult]:
+    """Run the alternative commands concurrently and return the first result to be accepted (by default,
+    the first to succeed), killing the ones still running; if none is, the last one to finish.
+    """
+    accept = accept or (lambda result: result.ok)
+    tasks = [asyncio.ensure_future(capture_process_async(*cmd, cwd=cwd, timeout=timeout)) for cmd in commands]
+    result = None
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            result = await next_done
+            if accept(result):
+                break
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+    return result
+
+
+def run_sync(awaitable: Awaitable[T]) -> T:
+    """Wait for the awaitable from synchronous code, even if an event loop is already running in this thread."""
+
+    async def wrapper() -> T:
+        return await awaitable
+
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(wrapper())
+    with ThreadPoolExecutor(1) as executor:
+        return executor.submit(asyncio.run, wrapper()).result()
+
+
+def gather_processes(
+    commands: Iterable[Sequence[str]],
+    cwd: Union[Path, None] = None,
+    timeout: Optional[float] = None,
+    concurrency: int = DEFAULT_CONCURRENCY,
+) -> list[ProcessResult]:
+    """The synchronous facade of `gather_processes_async`."""
+    return run_sync(gather_processes_async(commands, cwd, timeout, concurrency))
+
+
+def first_process(
+    commands: Iterable[Sequence[str]],
+    accept: Optional[Callable[[ProcessResult], bool]] = None,
+    cwd: Union[Path, None] = None,
+    timeout: Optional[float] = None,
+) -> Optional[ProcessResult]:
+    """The synchronous facade of `first_process_async`."""
+    return run_sync(first_process_async(commands, accept, cwd, timeout))
+
+
+def capture_process(*args: str, cwd: Union[Path, None] = None, timeout: Optional[float] = None) -> ProcessResult:
+    return gather_processes([args], cwd, timeout)[0]
@@ -1,7 +1,7 @@
 import re
 import shutil
-import subprocess
 import sys
+from collections.abc import Sequence
 from pathlib import Path
 from typing import TYPE_CHECKING, Optional
 
@@ -9,7 +9,17 @@ from colorama import Fore
 
 from entari_cli import i18n_
 from entari_cli.consts import REQUIRES_PYTHON
-from entari_cli.process import run_process
+from entari_cli.context import find_project_root
+from entari_cli.installer import (
+    WHEELHOUSE_PMS,
+    Prefetch,
+    download_args,
+    find_uv,
+    get_pip_backend,
+    resolve_wheelhouse,
+    wheelhouse_args,
+)
+from entari_cli.process import gather_processes, run_process
 from entari_cli.py_info import PythonInfo, iter_interpreters
 from entari_cli.setting import set_item
 from entari_cli.utils import ask, is_conda_base_python
@@ -45,15 +55,8 @@ def get_user_email_from_git() -> tuple[str, str]:
     git = shutil.which("git")
     if not git:
         return "", ""
-    try:
-        username = subprocess.check_output([git, "config", "user.name"], text=True, encoding="utf-8").strip()
-    except subprocess.CalledProcessError:
-        username = ""
-    try:
-        email = subprocess.check_output([git, "config", "user.email"], text=True, encoding="utf-8").strip()
-    except subprocess.CalledProcessError:
-        email = ""
-    return username, email
+    username, email = gather_processes([[git, "config", "user.name"], [git, "config", "user.email"]], timeout=10)
+    return (username.stdout.strip() if username.ok else ""), (email.stdout.strip() if email.ok else "")
 
 
 def validate_project_name(name: str) -> bool:
@@ -94,35 +97,37 @@ def select_python(cwd: Path, python: str) -> PythonInfo:
     return found_interpreters[int(selection)]
 
 
-def ensure_python(cwd: Path, python: str = "") -> PythonInfo:
+def ensure_python(cwd: Path, python: str = "", requirements: Optional[Sequence[str]] = None) -> PythonInfo:
+    """Select the interpreter, and create the venv of the project with it if needed."""
     selected_python = select_python(cwd, python)
     if selected_python.get_venv() is None or is_conda_base_python(selected_python.path):
+        base_python = str(selected_python.path)
         prompt = f"{cwd.name}-{selected_python.major}.{selected_python.minor}"
-        create_virtualenv(cwd / ".venv", str(selected_python.path), prompt)
+        create_virtualenv(cwd / ".venv", base_python, prompt, requirements)
         selected_python = PythonInfo.from_path(get_venv_python(cwd)[0])
     return selected_python
 
 
 def get_project_root() -> Path:
     """Get the root directory of the current project."""
-    cwd = Path.cwd()
-    for parent in [cwd] + list(cwd.parents):
-        if (parent / "pyproject.toml").exists() or (parent / "setup.py").exists():
-            return parent
-    return cwd
+    return find_project_root(Path.cwd())
 
 
 def select_package_manager() -> tuple[str, str]:
     """Select a package manager from the available ones."""
-    available_pms = []
-    for pm in CHECK_PM_MAP:
-        if executable := shutil.which(pm):
-            available_pms.append((pm, executable))
+    found = [(pm, executable) for pm in CHECK_PM_MAP if (executable := shutil.which(pm))]
+    # the ones found are checked together, leaving out e.g. shims without an installed tool behind them
+    results = gather_processes([[exe, "--version"] for _, exe in found], timeout=10)
+    available_pms = [
+        (pm, exe, result.stdout.strip().splitlines()[0] if result.stdout.strip() else "")
+        for (pm, exe), result in zip(found, results)
+        if result.ok
+    ]
     if not available_pms:
         return "pip", "install"
     print(i18n_.project.select_pm())
-    for i, (pm, exe) in enumerate(available_pms):
-        print(f"{i:>2}. {Fore.GREEN}{pm}{Fore.RESET} ({exe})")
+    for i, (pm, exe, version) in enumerate(available_pms):
+        print(f"{i:>2}. {Fore.GREEN}{pm}{Fore.RESET} ({exe}{f', {version}' if version else ''})")
     selection = ask(i18n_.project.please_select(), default="0")
     if not selection.isdigit() or int(selection) < 0 or int(selection) >= len(available_pms):
         raise ValueError(i18n_.project.invalid_selection())
@@ -134,12 +139,10 @@ def install_dependencies(
     deps: list[str],
     python_path: Optional[str] = None,
     install_args: Optional[tuple[str, ...]] = None,
+    prefetch: Optional[Prefetch] = None,
 ):
-    """Install dependencies"""
-
-    def call_pip(*args):
-        return run_process(python_path or sys.executable, "-m", "pip", *args)
-
+    """Install dependencies, from the downloads of the prefetch as well when the package manager can"""
+    pip = get_pip_backend(python_path or sys.executable, setting.get_config("install.pip_backend"))
     pm = setting.get_config("install.package_manager")
     cmd = setting.get_config("install.command")
     if not pm:
@@ -152,30 +155,73 @@ def install_dependencies(
     install_args = install_args or ()
     if de_install_args:
         install_args = (*de_install_args.split(","), *install_args)
+    wheelhouse = resolve_wheelhouse(setting.context.root, setting.get_config("install.wheelhouse"))
+    if wheelhouse is not None:
+        if not wheelhouse.is_dir():
+            print(f"{Fore.RED}{i18n_.project.wheelhouse_missing(path=str(wheelhouse))}{Fore.RESET}")
+            return 1
+        install_args = (*install_args, *wheelhouse_args(wheelhouse))
+        if pm not in WHEELHOUSE_PMS:
+            print(f"{Fore.YELLOW}{i18n_.project.offline_fallback(pm=pm)}{Fore.RESET}")
+            pm = "pip"
+    # waited for only now, so the downloads also overlap with the package manager selection
+    find_links = prefetch.wait() if prefetch else []
+    links = tuple(arg for link in find_links for arg in ("--find-links", str(link)))
     if pm == "pip":
-        ret_code = call_pip("install", *install_args, *deps)
+        pm = pip.name
+        ret_code = pip.install(deps, (*install_args, *links))
     else:
         executable = shutil.which(pm)
         if not executable:
             print(f"{Fore.YELLOW}{i18n_.project.fallback_pip(pm=pm)}{Fore.RESET}")
-            pm = "pip"
-            ret_code = call_pip("install", *install_args, *deps)
+            pm = pip.name
+            ret_code = pip.install(deps, (*install_args, *links))
         else:
-            ret_code = run_process(executable, cmd, *install_args, *deps)
+            if pm not in WHEELHOUSE_PMS:
+                links = ()
+            ret_code = run_process(executable, cmd, *install_args, *links, *deps)
     if ret_code != 0:
         print(f"{Fore.RED}{i18n_.project.install_failed(deps=', '.join(deps), pm=pm)}{Fore.RESET}")
     return ret_code
 
 
+def prefetch_dependencies(
+    setting: "SelfSetting",
+    deps: list[str],
+    install_args: Optional[tuple[str, ...]] = None,
+) -> Optional[Prefetch]:
+    """Start prefetching the dependencies, if the package manager is able to install from its downloads,
+    the install is not made from a wheelhouse and its arguments can be told apart for a download.
+
+    It is run with the current interpreter, as the one of the project may not be chosen yet;
+    the install fetches whatever it cannot use from the downloads itself.
+    """
+    pm = setting.get_config("install.package_manager")
+    if pm and pm not in WHEELHOUSE_PMS:
+        return None
+    if resolve_wheelhouse(setting.context.root, setting.get_config("install.wheelhouse")) is not None:
+        return None
+    de_install_args = setting.get_config("install.args")
+    install_args = install_args or ()
+    if de_install_args:
+        install_args = (*de_install_args.split(","), *install_args)
+    args = download_args(install_args)
+    if args is None:
+        return None
+    # the same uv the install will run with, whose cache is warmed instead of downloading with pip
+    uv = find_uv() if pm == "uv" or setting.get_config("install.pip_backend") != "pip" else None
+    prefetch = Prefetch(deps, args, uv)
+    prefetch.start(sys.executable)
+    return prefetch
+
+
 def uninstall_dependencies(
     setting: "SelfSetting",
     deps: list[str],
     python_path: Optional[str] = None,
     uninstall_args: Optional[tuple[str, ...]] = None,
 ):
-    def call_pip(*args):
-        return run_process(python_path or sys.executable, "-m", "pip", *args)
-
+    pip = get_pip_backend(python_path or sys.executable, setting.get_config("install.pip_backend"))
     pm = setting.get_config("install.package_manager")
     if not pm:
         pm, cmd = select_package_manager()
@@ -188,13 +234,14 @@ def uninstall_dependencies(
     if de_uninstall_args:
         uninstall_args = (*de_uninstall_args.split(","), *uninstall_args)
     if pm == "pip":
-        ret_code = call_pip("uninstall", "-y", *uninstall_args, *deps)
+        pm = pip.name
+        ret_code = pip.uninstall(deps, uninstall_args)
     else:
         executable = shutil.which(pm)
         if not executable:
             print(f"{Fore.YELLOW}{i18n_.project.fallback_pip(pm=pm)}{Fore.RESET}")
-            pm = "pip"
-            ret_code = call_pip("uninstall", "-y", *uninstall_args, *deps)
+            pm = pip.name
+            ret_code = pip.uninstall(deps, uninstall_args)
         else:
             cmd = PM_REMOVE_MAP.get(pm, "uninstall")
             ret_code = run_process(executable, cmd, *uninstall_args, *deps)
@@ -1,49 +1,58 @@
 from __future__ import annotations
 
+import hashlib
 import json
 import os
 import shutil
-import subprocess
 import sys
-from collections.abc import Iterable
-from functools import cached_property
+from collections.abc import Iterable, Sequence
+from functools import cache, cached_property
 from pathlib import Path
-from typing import TYPE_CHECKING, Callable
+from typing import TYPE_CHECKING, Any, Callable
 
 from colorama import Fore
 from packaging.version import InvalidVersion, Version
 
 from entari_cli import i18n_
+from entari_cli.cache import JSONCache, fingerprint
 from entari_cli.consts import DEFAULT_PYTHON, WINDOWS, WINDOWS_DEFAULT_PYTHON
+from entari_cli.metadata import SitePackages, get_site_packages
+from entari_cli.process import ProcessResult, first_process
 from entari_cli.utils import find_python_in_path
 from entari_cli.venv import VirtualEnv, get_venv_python
+from entari_cli.worker import WorkerError, get_worker, query_interpreter
 
 if TYPE_CHECKING:
-    from findpython import Finder, PythonVersion
+    from findpython import PythonVersion
 
 
 PYENV_ROOT = Path.expanduser(Path(os.getenv("PYENV_ROOT", "~/.pyenv")))
 
 
+def _printed_executable(result: ProcessResult) -> str | None:
+    if not result.ok or not result.stdout.strip():
+        return None
+    try:
+        return json.loads(result.stdout.splitlines()[-1].strip()) or None
+    except ValueError:
+        return None
+
+
 def _get_env_python() -> str:
     python_to_try = WINDOWS_DEFAULT_PYTHON if WINDOWS else DEFAULT_PYTHON
 
-    stdout, stderr = None, None
-
-    for python in python_to_try:
-        proc = subprocess.Popen(
-            f"{python} -W ignore -c " '"import sys, json; print(json.dumps(sys.executable))"',
-            shell=True,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-        )
-        stdout, stderr = proc.communicate()
-        if proc.returncode == 0:
-            try:
-                if executable := json.loads(stdout.splitlines()[-1].strip()):
-                    return executable
-            except Exception:
-                continue
+    # the candidates are probed together, the first one that answers wins and the others are stopped
+    result = first_process(
+        [
+            [python, "-W", "ignore", "-c", "import sys, json; print(json.dumps(sys.executable))"]
+            for python in python_to_try
+        ],
+        accept=lambda result: _printed_executable(result) is not None,
+        timeout=30,
+    )
+    if result is not None and (executable := _printed_executable(result)):
+        return executable
+    stdout, stderr = (result.stdout, result.stderr) if result is not None else (None, None)
     raise RuntimeError(
         "Cannot find a valid Python interpreter."
         + (f"\nstdout:\n{stdout}" if stdout else "")
@@ -70,6 +79,82 @@ def get_default_python(cwd: Path | None = None, prompt: bool = False) -> str:
     return _get_env_python()
 
 
+_interpreter_cache = JSONCache("interpreters")
+_probed: dict[str, dict[str, Any] | ProbeError] = {}
+"""the interpreters probed in this run by cache key, so that each one is run at most once"""
+# the files and variables selecting the interpreter a pyenv or asdf shim runs
+SHIM_VERSION_FILES = (".python-version", ".tool-versions")
+SHIM_VERSION_ENV = ("PYENV_VERSION", "PYENV_ROOT", "ASDF_PYTHON_VERSION", "ASDF_DATA_DIR")
+
+
+class ProbeError(OSError):
+    """The probe of the interpreter failed, now or in an earlier run while the executable was the same."""
+
+
+@cache
+def _is_script(path: Path) -> bool:
+    """Shims (pyenv, asdf, ...) are scripts whose target may change without touching the file."""
+    try:
+        with path.open("rb") as f:
+            return f.read(2) == b"#!"
+    except OSError:
+        return True
+
+
+@cache
+def _shim_context(cwd: Path) -> str:
+    """A digest of what selects the target of a shim: the version files in effect and the variables overriding them."""
+    sources = []
+    for name in SHIM_VERSION_FILES:
+        for directory in (cwd, *cwd.parents):
+            if (directory / name).is_file():
+                sources.append(directory / name)
+                break
+    sources += [PYENV_ROOT / "version", Path.home() / ".tool-versions"]
+    state = [[str(source), fingerprint(source)] for source in sources]
+    state += [os.getenv(name) for name in SHIM_VERSION_ENV]
+    return hashlib.sha1(json.dumps(state).encode("utf-8")).hexdigest()
+
+
+def _probe(key: str, executable: Path, probe: Callable[[], dict[str, Any]]) -> dict[str, Any] | ProbeError:
+    entry = _interpreter_cache.get(key, executable)
+    if entry is not None and "fields" in entry:
+        return entry["fields"]
+    if entry is not None and "error" in entry:
+        return ProbeError(entry["error"])
+    try:
+        fields = probe()
+    except Exception as e:
+        # broken interpreters are remembered as well, until the executable changes
+        _interpreter_cache.update(key, executable, error=repr(e))
+        return ProbeError(repr(e))
+    _interpreter_cache.update(key, executable, fields=fields)
+    return fields
+
+
+def probe_interpreter(executable: Path, probe: Callable[[], dict[str, Any]]) -> dict[str, Any]:
+    """Get the fields of the interpreter the probe reports, at most once per run and through the on-disk cache,
+    keyed by the executable path and the inode, mtime and size of the file it points to;
+    for shims, by what selects their target as well. Failures are cached too, and raised as `ProbeError`."""
+    key = str(executable)
+    if _is_script(executable):
+        key = f"{key}\0{_shim_context(Path.cwd())}"
+    if key not in _probed:
+        _probed[key] = _probe(key, executable, probe)
+    result = _probed[key]
+    if isinstance(result, ProbeError):
+        raise ProbeError(*result.args)
+    return result
+
+
+def invalidate_interpreter_cache(path: str | Path | None = None) -> None:
+    """Drop the cached metadata of the interpreter, or of all interpreters if no path is given."""
+    _interpreter_cache.invalidate(None if path is None else str(path))
+    for key in list(_probed):
+        if path is None or key.split("\0", 1)[0] == str(path):
+            del _probed[key]
+
+
 class PythonInfo:
     """
     A convenient helper class that holds all information of a Python interpreter.
@@ -80,9 +165,9 @@ class PythonInfo:
 
     @classmethod
     def from_path(cls, path: str | Path) -> PythonInfo:
-        from findpython import PythonVersion
+        from entari_cli.finder import CachedPythonVersion
 
-        py_ver = PythonVersion(Path(path))
+        py_ver = CachedPythonVersion(Path(path))
         return cls(py_ver)
 
     @cached_property
@@ -153,24 +238,6 @@ class PythonInfo:
         return VirtualEnv.from_interpreter(self.executable)
 
 
-def get_python_finder(cwd: Path, search_venv: bool = True) -> Finder:
-    from findpython import ALL_PROVIDERS, Finder
-
-    from entari_cli.venv import VenvProvider
-
-    providers: list[str] = ["venv", *ALL_PROVIDERS.keys()]
-    venv_pos = -1
-    if not providers:
-        venv_pos = 0
-    elif "venv" in providers:
-        venv_pos = providers.index("venv")
-        providers.remove("venv")
-    finder = Finder(resolve_symlinks=True, selected_providers=providers or None)
-    if search_venv and venv_pos >= 0:
-        finder.add_provider(VenvProvider(cwd), venv_pos)
-    return finder
-
-
 def find_interpreters(
     cwd: Path, python_spec: str | None = None, search_venv: bool | None = None
 ) -> Iterable[PythonInfo]:
@@ -212,6 +279,8 @@ def find_interpreters(
         finder_arg = python_spec
     if search_venv is None:
         search_venv = True
+    from entari_cli.finder import get_python_finder
+
     finder = get_python_finder(cwd, search_venv)
     for entry in finder.find_all(finder_arg, allow_prereleases=True):
         yield PythonInfo(entry)
@@ -245,140 +314,62 @@ def check_package_installed(
     package: str, python_path: str | None = None, cwd: Path | None = None, local: bool = False
 ) -> bool:
     executable = python_path or get_default_python(cwd)
+    if (site := get_site_packages(executable)) is not None:
+        if local:
+            return site.find_spec(package) is not None
+        return site.package_info(package) is not None
     if local:
-        script = f"""\
-import json
-import importlib.util
-print(json.dumps(importlib.util.find_spec('{package}') is not None))
-"""
-    else:
-        script = f"""\
-import json
-import importlib.metadata
-try:
-    importlib.metadata.distribution('{package}')
-    print(json.dumps(True))
-except importlib.metadata.PackageNotFoundError:
-    print(json.dumps(False))
-"""
-    proc = subprocess.Popen(
-        [executable, "-W", "ignore", "-c", script],
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
-    )
-    stdout, _ = proc.communicate()
-    if proc.returncode == 0:
-        try:
-            return json.loads(stdout.splitlines()[-1].strip())
-        except Exception:
-            return False
-    return False
+        return query_interpreter(executable, "find_spec", package) is not None
+    return query_interpreter(executable, "distribution", package, default=False)
 
 
 def get_package_module(package: str, python_path: str | None = None, cwd: Path | None = None) -> str | None:
     executable = python_path or get_default_python(cwd)
-    script = f"""\
-import json
-import importlib.util
-import importlib.metadata
-
-dist = importlib.metadata.distribution('{package}')
-files = dist.files
-if not files:
-    print(json.dumps(None))
-    exit(0)
-importable = set()
-for file in files:
-    if file.suffix == '.py' or file.suffix == '.pyc':
-        parts = file.parts
-        if parts[-1] == '__init__.py' or parts[-1] == '__init__.pyc':
-            importable.add('.'.join(parts[:-1]))
-        else:
-            importable.add('.'.join(parts).rsplit('.', 1)[0])
-if not importable:
-    print(json.dumps(None))
-    exit(0)
-
-importable = list(importable)
-importable.sort(key=lambda x: len(x))
-
-spec = None
-for name in importable:
-    spec = importlib.util.find_spec(name)
-    if spec is not None:
-        break
-if spec is None or spec.origin is None:
-    print(json.dumps(None))
-    exit(0)
-print(json.dumps(spec.name))
-"""
-    proc = subprocess.Popen(
-        [executable, "-W", "ignore", "-c", script],
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
-    )
-    stdout, _ = proc.communicate()
-    if proc.returncode == 0:
-        try:
-            return json.loads(stdout.splitlines()[-1].strip())
-        except Exception:
-            return None
-    return None
+    if (site := get_site_packages(executable)) is not None:
+        return site.package_module(package)
+    return query_interpreter(executable, "package_module", package)
 
 
 def get_module_package(module: str, python_path: str | None = None, cwd: Path | None = None) -> str | None:
     executable = python_path or get_default_python(cwd)
-    script = f"""\
-import json
-import importlib.util
-import importlib.metadata
-from pathlib import Path
-
-spec = importlib.util.find_spec('{module}')
-if spec is None or spec.origin is None:
-    print(json.dumps(None))
-    exit(0)
-for dist in importlib.metadata.distributions(name="cli_lite"):
-    relative_path = Path(spec.origin).relative_to(str(dist.locate_file(""))).as_posix()
-    if relative_path in map(str, dist.files or []):
-        break
-else:
-    print(json.dumps(None))
-    exit(0)
-print(json.dumps(dist.metadata['Name']))
-"""
-    proc = subprocess.Popen(
-        [executable, "-W", "ignore", "-c", script],
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
-    )
-    stdout, _ = proc.communicate()
-    if proc.returncode == 0:
-        try:
-            return json.loads(stdout.splitlines()[-1].strip())
-        except Exception:
-            return None
+    if (site := get_site_packages(executable)) is not None:
+        return site.module_package(module)
+    return query_interpreter(executable, "module_package", module)
 
 
 def get_package_version(package: str, python_path: str | None = None, cwd: Path | None = None) -> str | None:
     executable = python_path or get_default_python(cwd)
-    script = f"""\
-import json
-import importlib.metadata
-print(json.dumps(importlib.metadata.version('{package}')))
-"""
-    proc = subprocess.Popen(
-        [executable, "-W", "ignore", "-c", script],
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
-    )
-    stdout, _ = proc.communicate()
-    if proc.returncode == 0:
-        try:
-            return json.loads(stdout.splitlines()[-1].strip())
-        except Exception:
+    if (site := get_site_packages(executable)) is not None:
+        return site.package_version(package)
+    return query_interpreter(executable, "version", package)
+
+
+def _ask_site_packages(site: SitePackages, op: str, *args: Any) -> Any:
+    """Answer a request of the introspection worker from the site-packages, in the same form."""
+    if op == "find_spec":
+        spec = site.find_spec(*args)
+        if spec is None:
             return None
-    return None
+        return {"name": spec.name, "origin": None if spec.origin is None else str(spec.origin)}
+    if op == "distribution":
+        return site.package_info(*args) is not None
+    if op == "version":
+        return site.package_version(*args)
+    return getattr(site, op)(*args)
+
+
+def query_packages(
+    requests: Sequence[tuple[str, tuple[Any, ...]]], python_path: str | None = None, cwd: Path | None = None
+) -> list[Any]:
+    """Answer the requests of the introspection worker (see `entari_cli.worker`) about the environment at once:
+    from its site-packages when they can be read, otherwise in a single batch. The answers are None if it fails."""
+    executable = python_path or get_default_python(cwd)
+    if (site := get_site_packages(executable)) is not None:
+        return [_ask_site_packages(site, op, *args) for op, args in requests]
+    try:
+        return get_worker(executable).batch(list(requests))
+    except WorkerError:
+        return [None] * len(requests)
 
 
 if __name__ == "__main__":
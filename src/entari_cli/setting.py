@@ -1,27 +1,55 @@
-from typing import Any
+import json
+import sys
+from collections.abc import Iterator, Mapping
+from datetime import date, datetime, time
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Optional
 
-from tomlkit import TOMLDocument, table
-from tomlkit.items import AoT, InlineTable, String, Table
+if sys.version_info >= (3, 11):
+    import tomllib
+else:
+    try:
+        import tomli as tomllib
+    except ImportError:
+        tomllib = None
 
+if TYPE_CHECKING:
+    from tomlkit import TOMLDocument
 
-def print_flattened(doc):
-    def walk(tbl, path):
+
+def _toml_repr(value: Any) -> str:
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, str):
+        return json.dumps(value, ensure_ascii=False)
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, list):
+        return f"[{', '.join(_toml_repr(v) for v in value)}]"
+    if isinstance(value, Mapping):
+        return f"{{{', '.join(f'{k} = {_toml_repr(v)}' for k, v in value.items())}}}"
+    return str(value)
+
+
+def flatten(data: Mapping[str, Any]) -> Iterator[tuple[str, str]]:
+    """Flatten the parsed setting into dotted keys, with values in their TOML representation
+    (strings are given without quotes)."""
+
+    def walk(tbl: Mapping[str, Any], path: list[str]):
         for k, v in tbl.items():
-            if isinstance(v, (Table, InlineTable)):
+            if isinstance(v, Mapping):
                 yield from walk(v, path + [k])
-            elif isinstance(v, AoT):
+            elif isinstance(v, list) and v and all(isinstance(t, Mapping) for t in v):
                 for i, t in enumerate(v):
                     yield from walk(t, path + [f"{k}[{i}]"])
             else:
                 yield ".".join(path + [k]), v
 
-    for key, item in walk(doc, []):
-        # 字符串去掉引号输出；其他类型用 TOML 表示
-        val = item.value if isinstance(item, String) else item.as_string()
-        yield key, val
+    for key, value in walk(data, []):
+        yield key, value if isinstance(value, str) else _toml_repr(value)
 
 
-def get_item(doc: TOMLDocument, key: str) -> Any:
+def get_item(doc: Mapping[str, Any], key: str) -> Any:
     keys = key.split(".")
     current = doc
     for k in keys:
@@ -32,7 +60,9 @@ def get_item(doc: TOMLDocument, key: str) -> Any:
     return current
 
 
-def set_item(doc: TOMLDocument, key: str, value):
+def set_item(doc: "TOMLDocument", key: str, value):
+    from tomlkit import table
+
     keys = key.split(".")
     current = doc
     for k in keys[:-1]:
@@ -40,7 +70,7 @@ def set_item(doc: TOMLDocument, key: str, value):
     current[keys[-1]] = value
 
 
-def del_item(doc: TOMLDocument, key: str):
+def del_item(doc: "TOMLDocument", key: str):
     keys = key.split(".")
     current = doc
     for k in keys[:-1]:
@@ -57,5 +87,87 @@ DEFAULT: dict[str, Any] = {
     "install.package_manager": "",
     "install.command": "",
     "install.args": "",
+    "install.pip_backend": "",
+    "install.wheelhouse": "",
     "uninstall.args": "",
 }
+
+
+class SettingLayer:
+    """A read-only view of one setting file, parsed once and reparsed only when the file changes."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._stamp: Optional[tuple[int, int]] = None
+        self._data: dict[str, Any] = {}
+        self._flattened: Optional[dict[str, str]] = None
+
+    def _check(self):
+        try:
+            st = self.path.stat()
+            stamp = (st.st_mtime_ns, st.st_size)
+        except OSError:
+            stamp = None
+        if stamp == self._stamp:
+            return
+        self._stamp = stamp
+        self._flattened = None
+        if stamp is None:
+            self._data = {}
+            return
+        text = self.path.read_text(encoding="utf-8")
+        if tomllib is not None:
+            self._data = tomllib.loads(text)
+        else:
+            from tomlkit import loads
+
+            self._data = loads(text).unwrap()
+
+    @property
+    def exists(self) -> bool:
+        self._check()
+        return self._stamp is not None
+
+    @property
+    def data(self) -> dict[str, Any]:
+        self._check()
+        return self._data
+
+    @property
+    def flattened(self) -> dict[str, str]:
+        self._check()
+        if self._flattened is None:
+            self._flattened = dict(flatten(self._data))
+        return self._flattened
+
+    def get(self, key: str) -> Any:
+        return get_item(self.data, key)
+
+
+_layers: dict[Path, SettingLayer] = {}
+
+
+def get_setting_layer(path: Path) -> SettingLayer:
+    if path not in _layers:
+        _layers[path] = SettingLayer(path)
+    return _layers[path]
+
+
+class SettingStore:
+    """The merged view of the local setting over the global setting over the defaults."""
+
+    def __init__(self, local_file: Path, global_file: Path):
+        self.local = get_setting_layer(local_file)
+        self.global_ = get_setting_layer(global_file)
+
+    def get(self, key: str) -> Any:
+        value = self.local.get(key)
+        if value is None:
+            value = self.global_.get(key)
+        if value is None:
+            return DEFAULT[key]
+        return value
+
+    @property
+    def flattened(self) -> dict[str, str]:
+        return {**self.global_.flattened, **self.local.flattened}
@@ -1,21 +1,26 @@
 from __future__ import annotations
 
 import dataclasses as dc
+import hashlib
+import json
+import os
 import shutil
 import subprocess
 import sys
-from collections.abc import Iterable
+import time
+from collections.abc import Sequence
 from functools import cached_property
 from pathlib import Path
 
 from colorama import Fore
-from findpython import BaseProvider, PythonVersion
 
 from entari_cli import i18n_
+from entari_cli.cache import cache_enabled, expired, fingerprint, get_cache_dir
 from entari_cli.consts import WINDOWS
 from entari_cli.utils import get_venv_like_prefix
 
 BIN_DIR = "Scripts" if WINDOWS else "bin"
+TEMPLATE_MARKER = "entari-template"
 
 
 def get_venv_python(cwd: Path | None = None) -> tuple[Path, Path]:
@@ -103,24 +108,6 @@ def get_in_project_venv(cwd: Path) -> VirtualEnv | None:
     return None
 
 
-class VenvProvider(BaseProvider):
-    """A Python provider for project venv pythons"""
-
-    def __init__(self, cwd: Path) -> None:
-        self.cwd = cwd
-
-    @classmethod
-    def create(cls):
-        return None
-
-    def find_pythons(self) -> Iterable[PythonVersion]:
-        in_project_venv = get_in_project_venv(self.cwd)
-        if in_project_venv is not None:
-            yield PythonVersion(
-                in_project_venv.interpreter, _interpreter=in_project_venv.interpreter, keep_symlink=True
-            )
-
-
 try:
     import virtualenv
 except ImportError:
@@ -144,8 +131,159 @@ def _ensure_clean(location: Path, force: bool = False) -> None:
                 child.unlink()
 
 
-def create_virtualenv(venv_dir: Path, base_python: str, prompt: str | None = None):
+def get_template_dir() -> Path:
+    return get_cache_dir() / "venv-templates"
+
+
+def template_key(base_python: str, requirements: Sequence[str]) -> str:
+    """The key of the template for the interpreter and the requirements (with the install arguments) put in it."""
+    executable = Path(base_python).resolve()
+    h = hashlib.sha1(str(executable).encode("utf-8"))
+    h.update(json.dumps([fingerprint(executable), *requirements]).encode("utf-8"))
+    return h.hexdigest()
+
+
+def _copy_tree(src: Path, dst: Path) -> None:
+    """Copy the venv, keeping the symlinks. The files are copied rather than hardlinked,
+    so that writing to them in place (e.g. a pip upgrade) cannot change the other copy.
+    The bytecode caches are left out, as the paths of the sources are compiled in them."""
+    for root, dirs, files in os.walk(src):
+        source = Path(root)
+        target = dst / source.relative_to(src)
+        target.mkdir(parents=True, exist_ok=True)
+        for name in list(dirs):
+            if name == "__pycache__":
+                dirs.remove(name)
+            elif (source / name).is_symlink():
+                dirs.remove(name)
+                os.symlink(os.readlink(source / name), target / name)
+        for name in files:
+            if (source / name).is_symlink():
+                os.symlink(os.readlink(source / name), target / name)
+            else:
+                shutil.copy2(source / name, target / name)
+
+
+def _relocate(venv_dir: Path, old_root: str, old_prompt: str | None, prompt: str | None) -> None:
+    """Point the activation scripts, the script shebangs and the pyvenv.cfg of a cloned venv to its new location."""
+    replaces = [(old_root.encode("utf-8"), str(venv_dir).encode("utf-8"))]
+    if old_prompt and prompt and old_prompt != prompt:
+        replaces.append((old_prompt.encode("utf-8"), prompt.encode("utf-8")))
+    for file in [venv_dir / "pyvenv.cfg", *(venv_dir / BIN_DIR).iterdir()]:
+        if file.is_symlink() or not file.is_file():
+            continue
+        data = file.read_bytes()
+        if b"\0" in data[:1024]:
+            continue
+        new_data = data
+        for old, new in replaces if file.name.startswith(("activate", "pyvenv")) else replaces[:1]:
+            new_data = new_data.replace(old, new)
+        if new_data != data:
+            file.write_bytes(new_data)
+
+
+def _forget_interpreter(venv_dir: Path) -> None:
+    """The venv interpreter has been replaced, drop whatever was cached about the previous one."""
+    from entari_cli.py_info import invalidate_interpreter_cache
+
+    invalidate_interpreter_cache(venv_dir.resolve() / BIN_DIR / ("python.exe" if WINDOWS else "python"))
+
+
+def _load_template(template: Path) -> dict | None:
+    """Read the metadata of the template, removing it if it has expired."""
+    try:
+        with (template / "template.json").open(encoding="utf-8") as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if expired(meta.get("created", 0)):
+        shutil.rmtree(template, ignore_errors=True)
+        return None
+    return meta
+
+
+def prune_venv_templates() -> None:
+    """Remove the expired templates, and those left half-built."""
+    try:
+        entries = list(get_template_dir().iterdir())
+    except OSError:
+        return
+    for entry in entries:
+        if entry.suffix == ".tmp":
+            try:
+                if expired(entry.stat().st_mtime):
+                    shutil.rmtree(entry, ignore_errors=True)
+            except OSError:
+                pass
+        elif entry.is_dir():
+            _load_template(entry)
+
+
+def has_venv_template(base_python: str, requirements: Sequence[str]) -> bool:
+    if WINDOWS or not cache_enabled():
+        return False
+    return _load_template(get_template_dir() / template_key(base_python, requirements)) is not None
+
+
+def clone_venv_template(venv_dir: Path, base_python: str, requirements: Sequence[str], prompt: str | None) -> bool:
+    """Clone the template built for the interpreter and the requirements into the empty venv_dir,
+    if there is one that has not expired."""
+    if WINDOWS or not cache_enabled():
+        return False
+    template = get_template_dir() / template_key(base_python, requirements)
+    meta = _load_template(template)
+    if meta is None:
+        return False
+    venv_dir = venv_dir.resolve()
+    try:
+        _copy_tree(template / "venv", venv_dir)
+        _relocate(venv_dir, meta["root"], meta.get("prompt"), prompt)
+    except (OSError, KeyError):
+        _ensure_clean(venv_dir, force=True)
+        return False
+    _forget_interpreter(venv_dir)
+    return True
+
+
+def save_venv_template(venv_dir: Path) -> None:
+    """Keep a copy of the venv as a template, if it has been created to be one and none exists yet."""
+    if WINDOWS or not cache_enabled():
+        return
+    root = venv_dir.resolve()
+    venv = VirtualEnv(root, False, root / BIN_DIR / "python")
+    key = venv.venv_config.get(TEMPLATE_MARKER)
+    if not key:
+        return
+    prune_venv_templates()
+    template = get_template_dir() / key
+    if template.exists():
+        return
+    building = template.with_name(f"{key}.{os.getpid()}.tmp")
+    try:
+        _copy_tree(venv.root, building / "venv")
+        with (building / "template.json").open("w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "root": str(venv.root),
+                    "prompt": venv.venv_config.get("prompt", "").strip("'\""),
+                    "created": time.time(),
+                },
+                f,
+            )
+        building.rename(template)
+    except OSError:
+        shutil.rmtree(building, ignore_errors=True)
+
+
+def create_virtualenv(
+    venv_dir: Path, base_python: str, prompt: str | None = None, requirements: Sequence[str] | None = None
+):
+    """Create the venv; with the `requirements` it will be installed with, the venv is cloned from
+    a template if one exists, otherwise it is marked to become one (see `save_venv_template`)."""
     _ensure_clean(venv_dir, force=True)
+    if requirements is not None and clone_venv_template(venv_dir, base_python, requirements, prompt):
+        print(f"{Fore.GREEN}{i18n_.venv.clone(venv_python=f'{Fore.YELLOW}{venv_dir.resolve()}')}{Fore.RESET}")
+        return venv_dir
     prompt_option = (f"--prompt={prompt}",) if prompt else ()
     if virtualenv:
         cmd = [sys.executable, "-m", "virtualenv", str(venv_dir), "--python", base_python, *prompt_option]
@@ -153,5 +291,9 @@ def create_virtualenv(venv_dir: Path, base_python: str, prompt: str | None = Non
     else:
         cmd = [base_python, "-m", "venv", str(venv_dir), *prompt_option]
         subprocess.check_call(cmd, stdout=subprocess.DEVNULL)
+    if requirements is not None:
+        with (venv_dir / "pyvenv.cfg").open("a", encoding="utf-8") as f:
+            f.write(f"{TEMPLATE_MARKER} = {template_key(base_python, requirements)}\n")
+    _forget_interpreter(venv_dir)
     print(f"{Fore.GREEN}{i18n_.venv.create(venv_python=f'{Fore.YELLOW}{venv_dir.resolve()}')}{Fore.RESET}")
     return venv_dir
@@ -0,0 +1,220 @@
+"""A long-lived introspection worker running inside a target interpreter.
+
+Questions that cannot be answered by reading the environment's files (see `entari_cli.metadata`)
+are sent to a worker process started once per interpreter and CLI invocation.
+Requests and responses are JSON objects, one per line, over the worker's stdin/stdout,
+so a batch of questions pays the interpreter startup only once.
+"""
+
+from __future__ import annotations
+
+import atexit
+import json
+import subprocess
+from typing import Any
+
+WORKER_SCRIPT = """\
+import importlib
+import importlib.metadata
+import importlib.util
+import json
+import os
+import sys
+from pathlib import Path
+
+out = os.fdopen(os.dup(1), "w", encoding="utf-8")
+sys.stdout = sys.stderr
+
+
+def _find_spec(name):
+    try:
+        return importlib.util.find_spec(name)
+    except (ImportError, ValueError):
+        return None
+
+
+def find_spec(name):
+    spec = _find_spec(name)
+    if spec is None:
+        return None
+    return {"name": spec.name, "origin": spec.origin}
+
+
+def distribution(name):
+    try:
+        importlib.metadata.distribution(name)
+    except importlib.metadata.PackageNotFoundError:
+        return False
+    return True
+
+
+def version(name):
+    try:
+        return importlib.metadata.version(name)
+    except importlib.metadata.PackageNotFoundError:
+        return None
+
+
+def package_module(name):
+    try:
+        dist = importlib.metadata.distribution(name)
+    except importlib.metadata.PackageNotFoundError:
+        return None
+    importable = set()
+    for file in dist.files or []:
+        if file.suffix in (".py", ".pyc") and "__pycache__" not in file.parts:
+            parts = file.parts[:-1] if file.stem == "__init__" else (*file.parts[:-1], file.stem)
+            if parts and all(part.isidentifier() for part in parts):
+                importable.add(".".join(parts))
+    for module in sorted(importable, key=len):
+        spec = _find_spec(module)
+        if spec is not None:
+            return spec.name if spec.origin is not None else None
+    return None
+
+
+def module_package(name):
+    spec = _find_spec(name)
+    if spec is None or spec.origin is None:
+        return None
+    for dist in importlib.metadata.distributions():
+        try:
+            relative_path = Path(spec.origin).relative_to(str(dist.locate_file(""))).as_posix()
+        except ValueError:
+            continue
+        if relative_path in (file.as_posix() for file in dist.files or []):
+            return dist.metadata["Name"]
+    return None
+
+
+def plugin_entry_points():
+    result = {}
+    for dist in importlib.metadata.distributions():
+        for ep in dist.entry_points:
+            if ep.group in ("arclet.entari", "entari"):
+                result.setdefault(ep.name, (ep.value, dist.metadata["Name"]))
+    return result
+
+
+OPS = {
+    "find_spec": find_spec,
+    "distribution": distribution,
+    "version": version,
+    "package_module": package_module,
+    "module_package": module_package,
+    "plugin_entry_points": plugin_entry_points,
+}
+
+for line in sys.stdin:
+    if not line.strip():
+        continue
+    request = json.loads(line)
+    if request.get("op") == "invalidate":
+        importlib.invalidate_caches()
+        continue
+    try:
+        response = {"id": request["id"], "result": OPS[request["op"]](*request["args"])}
+    except Exception as e:
+        response = {"id": request["id"], "error": repr(e)}
+    out.write(json.dumps(response) + "\\n")
+    out.flush()
+"""
+
+
+class WorkerError(RuntimeError):
+    pass
+
+
+class IntrospectionWorker:
+    """Client of a worker process running in the given interpreter."""
+
+    def __init__(self, executable: str):
+        self.executable = executable
+        self._proc: subprocess.Popen[str] | None = None
+        self._next_id = 0
+
+    def start(self) -> subprocess.Popen[str]:
+        if self._proc is None or self._proc.poll() is not None:
+            try:
+                self._proc = subprocess.Popen(
+                    [self.executable, "-W", "ignore", "-c", WORKER_SCRIPT],
+                    stdin=subprocess.PIPE,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.DEVNULL,
+                    text=True,
+                    encoding="utf-8",
+                    bufsize=1,
+                )
+            except OSError as e:
+                raise WorkerError(f"cannot start worker in {self.executable}") from e
+        return self._proc
+
+    def batch(self, requests: list[tuple[str, tuple[Any, ...]]]) -> list[Any]:
+        """Send all the requests at once, then collect their results in order."""
+        proc = self.start()
+        assert proc.stdin is not None
+        assert proc.stdout is not None
+        ids = []
+        try:
+            # files may have been created or installed since the last batch
+            lines = [json.dumps({"op": "invalidate"})]
+            for op, args in requests:
+                self._next_id += 1
+                ids.append(self._next_id)
+                lines.append(json.dumps({"id": self._next_id, "op": op, "args": list(args)}))
+            proc.stdin.write("\n".join(lines) + "\n")
+            proc.stdin.flush()
+            responses = {}
+            while len(responses) < len(ids):
+                line = proc.stdout.readline()
+                if not line:
+                    raise WorkerError(f"worker in {self.executable} exited unexpectedly")
+                response = json.loads(line)
+                responses[response["id"]] = response
+        except (OSError, ValueError) as e:
+            self.close()
+            raise WorkerError(f"worker in {self.executable} failed") from e
+        results = []
+        for id_ in ids:
+            if "error" in responses[id_]:
+                raise WorkerError(responses[id_]["error"])
+            results.append(responses[id_]["result"])
+        return results
+
+    def request(self, op: str, *args: Any) -> Any:
+        return self.batch([(op, args)])[0]
+
+    def close(self) -> None:
+        if self._proc is None:
+            return
+        proc, self._proc = self._proc, None
+        try:
+            if proc.stdin:
+                proc.stdin.close()
+            proc.wait(timeout=1)
+        except (OSError, subprocess.TimeoutExpired):
+            proc.kill()
+
+
+_workers: dict[str, IntrospectionWorker] = {}
+
+
+def get_worker(executable: str) -> IntrospectionWorker:
+    if executable not in _workers:
+        _workers[executable] = IntrospectionWorker(executable)
+    return _workers[executable]
+
+
+@atexit.register
+def close_workers() -> None:
+    for worker in _workers.values():
+        worker.close()
+    _workers.clear()
+
+
+def query_interpreter(executable: str, op: str, *args: Any, default: Any = None) -> Any:
+    """Ask the worker of the interpreter a single question, returning the default if it fails."""
+    try:
+        return get_worker(executable).request(op, *args)
+    except WorkerError:
+        return default
@@ -0,0 +1,28 @@
+import re
+
+import pytest
+
+from entari_cli import i18n_
+from entari_cli.commands.adapter import parse_selection
+
+
+@pytest.mark.parametrize(
+    ("selection", "expected"),
+    [
+        ("0", [0]),
+        ("1,3,5", [1, 3, 5]),
+        ("0-2 4", [0, 1, 2, 4]),
+        ("4, 0-1", [4, 0, 1]),
+        ("2-2", [2]),
+        ("1 0-2 1", [1, 0, 2]),
+        ("  3 ,, 5  ", [3, 5]),
+    ],
+)
+def test_parse_selection(selection, expected):
+    assert parse_selection(selection, 6) == expected
+
+
+@pytest.mark.parametrize("selection", ["", " , ", "a", "-1", "1-", "-", "1-x", "6", "4-6", "1.5", "2-1", "0 2-1"])
+def test_parse_invalid_selection(selection):
+    with pytest.raises(ValueError, match=re.escape(i18n_.commands.adapter.prompts.invalid_selection())):
+        parse_selection(selection, 6)
@@ -0,0 +1,117 @@
+import json
+import os
+import time
+
+import pytest
+
+from entari_cli import cache
+from entari_cli.cache import JSONCache, expired, fingerprint, flush_caches
+
+
+@pytest.fixture(autouse=True)
+def loaded_caches(monkeypatch):
+    monkeypatch.setattr(cache, "_loaded_caches", [])
+
+
+@pytest.fixture
+def described(isolated):
+    file = isolated / "described.txt"
+    file.write_text("content")
+    return file
+
+
+def test_fingerprint_is_hashable(described):
+    fp = fingerprint(described)
+    assert isinstance(fp, tuple)
+    assert hash(fp) == hash(fingerprint(described))
+    assert fingerprint(described.with_name("missing")) is None
+
+
+def test_round_trip(described):
+    store = JSONCache("test")
+    store.update("key", described, value=1)
+    store.flush()
+    assert json.loads(store.path.read_text())["entries"]["key"]["value"] == 1
+
+    reloaded = JSONCache("test")
+    assert reloaded.get("key", described) == {"$fingerprint": list(fingerprint(described)), "value": 1}
+
+
+def test_flush_on_exit(described):
+    JSONCache("test").update("key", described, value=1)
+    flush_caches()
+    assert JSONCache("test").get("key", described)["value"] == 1
+
+
+@pytest.mark.parametrize("change", ["content", "mtime", "remove"])
+def test_invalidated_by_file_change(described, change):
+    store = JSONCache("test")
+    store.update("key", described, value=1)
+    store.flush()
+    if change == "content":
+        described.write_text("other content")
+    elif change == "mtime":
+        st = described.stat()
+        os.utime(described, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+    else:
+        described.unlink()
+
+    reloaded = JSONCache("test")
+    assert reloaded.get("key", described) is None
+    # the stale entry is dropped from the file as well
+    reloaded.flush()
+    assert "key" not in JSONCache("test").data
+
+
+def test_update_merges_only_while_valid(described):
+    store = JSONCache("test")
+    store.update("key", described, first=1)
+    store.update("key", described, second=2)
+    assert store.get("key", described).keys() == {"$fingerprint", "first", "second"}
+    described.write_text("other content")
+    store.update("key", described, third=3)
+    assert store.get("key", described).keys() == {"$fingerprint", "third"}
+
+
+def test_other_version_is_ignored(described):
+    store = JSONCache("test")
+    store.update("key", described, value=1)
+    store.flush()
+    assert JSONCache("test", version=2).get("key", described) is None
+
+
+def test_corrupted_file_is_ignored(described):
+    store = JSONCache("test")
+    store.path.parent.mkdir(parents=True)
+    store.path.write_text("{not json")
+    assert store.get("key", described) is None
+    store.update("key", described, value=1)
+    store.flush()
+    assert JSONCache("test").get("key", described)["value"] == 1
+
+
+def test_disabled(described, monkeypatch):
+    monkeypatch.setattr(cache, "_enabled", False)
+    store = JSONCache("test")
+    store.update("key", described, value=1)
+    assert store.get("key", described) is None
+    store.flush()
+    assert not store.path.exists()
+
+
+def test_invalidate(described):
+    store = JSONCache("test")
+    store.update("key", described, value=1)
+    store.update("other", described, value=2)
+    store.invalidate("key")
+    assert store.get("key", described) is None
+    assert store.get("other", described) is not None
+    store.invalidate()
+    store.flush()
+    assert JSONCache("test").data == {}
+
+
+def test_expired():
+    assert not expired(time.time())
+    assert expired(0)
+    assert expired(0, ttl=1)
@@ -0,0 +1,193 @@
+import pytest
+
+from entari_cli import config
+from entari_cli.cache import JSONCache
+from entari_cli.config import EntariConfig, load_env_with_environment
+
+
+def test_load_env_next_to_dotenv(isolated):
+    (isolated / ".env").write_text("ENVIRONMENT=dev\nFOO=base\n", encoding="utf-8")
+    (isolated / ".env.local").write_text("BAR=local\n", encoding="utf-8")
+    (isolated / ".env.dev").write_text("FOO=dev\n", encoding="utf-8")
+
+    env = load_env_with_environment()
+    assert env["FOO"] == "dev"
+    assert env["BAR"] == "local"
+    # answered from the cache the second time
+    assert dict(load_env_with_environment()) == dict(env)
+
+
+def test_load_env_cache_follows_changes(isolated):
+    (isolated / ".env").write_text("FOO=1\n", encoding="utf-8")
+    assert load_env_with_environment()["FOO"] == "1"
+    (isolated / ".env").write_text("FOO=22\n", encoding="utf-8")
+    assert load_env_with_environment()["FOO"] == "22"
+
+
+def test_load_config_next_to_dotenv(isolated):
+    (isolated / ".env").write_text("TOKEN=secret\n", encoding="utf-8")
+    (isolated / "entari.yml").write_text("basic:\n  network: []\nplugins:\n  echo: {}\n", encoding="utf-8")
+
+    cfg = EntariConfig.load()
+    assert cfg.plugin_names == ["echo"]
+
+
+@pytest.fixture(autouse=True)
+def fresh_fragment_cache(monkeypatch):
+    monkeypatch.setattr(config, "_fragment_meta_cache", JSONCache("config-fragments"))
+
+
+def write_config(isolated, text: str):
+    path = isolated / "entari.yml"
+    path.write_text(text, encoding="utf-8")
+    return path
+
+
+def test_plugin_order(isolated):
+    write_config(
+        isolated,
+        "plugins:\n"
+        "  $prelude: [first]\n"
+        "  late:\n    $priority: 32\n"
+        "  first: {}\n"
+        "  early:\n    $priority: 0\n"
+        "  ?maybe: {}\n"
+        "  ~off: {}\n",
+    )
+    cfg = EntariConfig.load()
+    assert cfg.plugin_names == ["early", "first", "off", "late"]
+    assert cfg.prelude_plugin_names == ["first"]
+    assert cfg.plugin.optional == {"maybe"}
+    assert cfg.plugin.disabled == {"off"}
+
+    # the index follows the changes to the table
+    cfg.plugin["added"] = {"$priority": 1}
+    del cfg.plugin["first"]
+    cfg.plugin["late"]["$priority"] = -1
+    cfg.plugin.refresh("late")
+    assert cfg.plugin_names == ["late", "early", "added", "off"]
+
+
+def test_fragments_round_trip(isolated):
+    (isolated / "plugins").mkdir()
+    (isolated / "plugins" / "echo.yml").write_text("prefix: '>'\n$priority: 0\n", encoding="utf-8")
+    (isolated / "plugins" / "untouched.yml").write_text("# kept as is\nvalue: 1\n", encoding="utf-8")
+    write_config(isolated, "plugins:\n  $files: [plugins]\n  main: {}\n")
+
+    cfg = EntariConfig.load()
+    assert cfg.plugin_names == ["echo", "main", "untouched"]
+    assert cfg.plugin["echo"]["prefix"] == ">"
+    cfg.plugin["echo"]["prefix"] = "!"
+    cfg.save()
+
+    assert "main" in (isolated / "entari.yml").read_text(encoding="utf-8")
+    assert "echo" not in (isolated / "entari.yml").read_text(encoding="utf-8")
+    # fragments that were not changed are not rewritten
+    assert (isolated / "plugins" / "untouched.yml").read_text(encoding="utf-8") == "# kept as is\nvalue: 1\n"
+    cfg = EntariConfig.load()
+    assert cfg.plugin["echo"] == {"prefix": "!", "$priority": 0}
+    assert cfg.plugin_names == ["echo", "main", "untouched"]
+
+    del cfg.plugin["echo"]
+    cfg.save()
+    assert not (isolated / "plugins" / "echo.yml").exists()
+    assert EntariConfig.load().plugin_names == ["main", "untouched"]
+
+
+def test_snapshot_cache(isolated, monkeypatch):
+    monkeypatch.setenv("ECHO_PREFIX", "hi")
+    path = write_config(isolated, "plugins:\n  echo:\n    prefix: ${{ env.ECHO_PREFIX }}\n")
+
+    cfg = EntariConfig.load(readonly=True)
+    assert not cfg._from_snapshot
+    assert cfg.snapshot_file.exists()
+    cfg = EntariConfig.load(readonly=True)
+    assert cfg._from_snapshot
+    assert cfg.plugin["echo"] == {"prefix": "hi"}
+    assert cfg.plugin_names == ["echo"]
+
+    # invalidated by a change to a variable read by the file
+    monkeypatch.setenv("ECHO_PREFIX", "hello")
+    cfg = EntariConfig.load(readonly=True)
+    assert not cfg._from_snapshot
+    assert cfg.plugin["echo"] == {"prefix": "hello"}
+
+    # and by a change to the file
+    path.write_text("plugins:\n  other: {}\n", encoding="utf-8")
+    cfg = EntariConfig.load(readonly=True)
+    assert not cfg._from_snapshot
+    assert cfg.plugin_names == ["other"]
+    with pytest.raises(RuntimeError):
+        cfg.save()
+
+
+def test_snapshot_follows_fragments(isolated):
+    (isolated / "plugins").mkdir()
+    (isolated / "plugins" / "echo.yml").write_text("prefix: '>'\n", encoding="utf-8")
+    write_config(isolated, "plugins:\n  $files: [plugins]\n")
+
+    assert EntariConfig.load(readonly=True).plugin_names == ["echo"]
+    (isolated / "plugins" / "added.yml").write_text("{}\n", encoding="utf-8")
+    cfg = EntariConfig.load(readonly=True)
+    assert not cfg._from_snapshot
+    assert sorted(cfg.plugin_names) == ["added", "echo"]
+
+
+def test_transaction(isolated):
+    path = write_config(isolated, "basic:\n  network: []\nplugins:\n  echo: {}\n")
+    cfg = EntariConfig.load()
+    with cfg.transaction() as tx:
+        tx.add("help", {"prefix": "/"}, priority=0)
+        tx.disable("echo")
+        tx.set("basic.log.level", "DEBUG")
+        tx.set("plugins.help.prefix", "/")  # unchanged
+        assert tx.add_adapter("@console")
+        assert not tx.add_adapter("@console")
+        assert not tx.remove("missing")
+        cfg.save()
+        # the save is deferred to the end of the transaction
+        assert "help" not in path.read_text(encoding="utf-8")
+    assert tx.count == 4
+
+    cfg = EntariConfig.load()
+    assert cfg.plugin_names == ["help", "echo"]
+    assert cfg.plugin.disabled == {"echo"}
+    assert cfg.basic["log"]["level"] == "DEBUG"
+    assert cfg.data["adapters"] == [{"$path": "@console"}]
+
+
+def test_transaction_not_saved_on_error(isolated):
+    path = write_config(isolated, "plugins:\n  echo: {}\n")
+    text = path.read_text(encoding="utf-8")
+    cfg = EntariConfig.load()
+
+    def change():
+        with cfg.transaction() as tx:
+            tx.add("help")
+            tx.enable("missing")
+
+    with pytest.raises(KeyError):
+        change()
+    assert path.read_text(encoding="utf-8") == text
+
+
+def test_transaction_apply(isolated):
+    write_config(isolated, "plugins:\n  echo: {}\n")
+    cfg = EntariConfig.load()
+    with cfg.transaction() as tx:
+        for operation in [
+            {"op": "add", "name": "help", "priority": 0},
+            {"op": "optional", "name": "echo"},
+            {"op": "unset", "key": "plugins.help.$priority"},
+            {"op": "remove_adapter", "path": "@console"},
+        ]:
+            tx.apply(operation)
+        with pytest.raises(ValueError, match="unknown operation"):
+            tx.apply({"op": "drop", "name": "echo"})
+        with pytest.raises(ValueError, match="unknown operation"):
+            tx.apply({"name": "echo"})
+    assert tx.count == 3
+
+    cfg = EntariConfig.load()
+    assert cfg.plugin_names == ["help"]
+    assert cfg.plugin.optional == {"echo"}
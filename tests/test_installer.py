@@ -0,0 +1,50 @@
+import pytest
+
+from entari_cli import installer
+from entari_cli.installer import PipBackend, UvPipBackend, download_args, get_pip_backend
+
+
+@pytest.mark.parametrize(
+    ("args", "expected"),
+    [
+        (["-U", "--pre"], ["-U", "--pre"]),
+        (["--no-cache-dir", "--trusted-host", "example.org"], ["--no-cache", "--allow-insecure-host", "example.org"]),
+        (["--trusted-host=example.org"], ["--allow-insecure-host=example.org"]),
+        (["-y", "--progress-bar", "off", "--no-deps"], ["--no-deps"]),
+        (
+            ["--progress-bar=off", "--disable-pip-version-check", "-i", "https://example.org"],
+            ["-i", "https://example.org"],
+        ),
+    ],
+)
+def test_uv_translate(args, expected):
+    assert UvPipBackend("python", "uv").translate(args) == expected
+
+
+def test_backend_commands():
+    assert PipBackend("python").command("install") == ["python", "-m", "pip", "install"]
+    assert PipBackend("python").translate(["--no-cache-dir"]) == ["--no-cache-dir"]
+    assert UvPipBackend("python", "uv").command("install") == ["uv", "pip", "install", "--python", "python"]
+
+
+def test_backend_choice(monkeypatch):
+    monkeypatch.setattr(installer, "find_uv", lambda: "/bin/uv")
+    assert isinstance(get_pip_backend("python"), UvPipBackend)
+    assert type(get_pip_backend("python", "pip")) is PipBackend
+    monkeypatch.setattr(installer, "find_uv", lambda: None)
+    assert type(get_pip_backend("python")) is PipBackend
+
+
+@pytest.mark.parametrize(
+    ("args", "expected"),
+    [
+        ([], []),
+        (["-U", "--pre", "-i", "https://example.org"], ["--pre", "-i", "https://example.org"]),
+        (["--upgrade-strategy", "eager", "--index-url=https://example.org"], ["--index-url=https://example.org"]),
+        (["--no-deps", "--user", "-q"], ["--no-deps"]),
+        (["-e", "."], None),
+        (["--target", "lib"], None),
+    ],
+)
+def test_download_args(args, expected):
+    assert download_args(args) == expected
@@ -0,0 +1,98 @@
+import pytest
+
+from entari_cli import metadata
+from entari_cli.cache import JSONCache
+from entari_cli.consts import WINDOWS
+from entari_cli.metadata import SitePackages
+
+pytestmark = pytest.mark.skipif(WINDOWS, reason="the fake environments use the POSIX layout")
+
+
+@pytest.fixture(autouse=True)
+def fresh_index(monkeypatch):
+    monkeypatch.setattr(metadata, "_index_cache", JSONCache("site-packages"))
+
+
+def write(path, text=""):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text, encoding="utf-8")
+
+
+def install(site, name, version, files, entry_points=""):
+    dist_info = site / f"{name.replace('-', '_')}-{version}.dist-info"
+    write(dist_info / "METADATA", f"Metadata-Version: 2.1\nName: {name}\nVersion: {version}\n\n")
+    records = [*files, f"{dist_info.name}/METADATA,,"]
+    for file in files:
+        write(site / file)
+    if entry_points:
+        write(dist_info / "entry_points.txt", entry_points)
+    write(dist_info / "RECORD", "\n".join(f"{file},," for file in records) + "\n")
+
+
+@pytest.fixture
+def venv(tmp_path):
+    base = tmp_path / "base"
+    write(base / "bin" / "python3.12")
+    write(base / "lib" / "python3.12" / "json" / "__init__.py")
+    write(base / "lib" / "python3.12" / "lib-dynload" / "_ssl.cpython-312-x86_64-linux-gnu.so")
+    root = tmp_path / "venv"
+    write(root / "pyvenv.cfg", f"home = {base / 'bin'}\ninclude-system-site-packages = false\nversion = 3.12.1\n")
+    write(root / "bin" / "python")
+    site = root / "lib" / "python3.12" / "site-packages"
+    install(site, "entari-plugin-echo", "1.0", ["entari_plugin_echo/__init__.py"])
+    install(
+        site,
+        "demo",
+        "0.2",
+        ["demo_pkg/__init__.py", "demo_pkg/plugin.py"],
+        "[arclet.entari]\ndemo = demo_pkg.plugin:main\n",
+    )
+    return root
+
+
+def test_reads_distributions(venv):
+    site = SitePackages.from_python(venv / "bin" / "python")
+    assert site is not None
+    assert site.package_version("entari_plugin_echo") == "1.0"
+    assert site.package_module("entari-plugin-echo") == "entari_plugin_echo"
+    assert site.module_package("entari_plugin_echo") == "entari-plugin-echo"
+    assert site.plugin_entry_points() == {"demo": ("demo_pkg.plugin:main", "demo")}
+    assert site.package_info("missing") is None
+
+
+def test_finds_stdlib_and_builtin_modules(venv):
+    site = SitePackages.from_python(venv / "bin" / "python")
+    assert site is not None
+    assert site.find_spec("json") is not None
+    assert site.find_spec("_ssl") is not None
+    assert site.find_spec("sys") is not None
+    assert site.module_package("json") is None
+    assert site.find_spec("missing") is None
+
+
+def test_index_cache_round_trip(venv):
+    site = SitePackages.from_python(venv / "bin" / "python")
+    assert site is not None
+    packages, modules = site.index
+    metadata._index_cache.flush()
+
+    # a new run reads the index from the cache file, without looking at the distributions
+    metadata._index_cache = JSONCache("site-packages")
+    again = SitePackages.from_python(venv / "bin" / "python")
+    assert again is not None
+    again._build_index = None  # type: ignore
+    assert again.index == (packages, modules)
+
+
+def test_index_follows_installs(venv):
+    site = SitePackages.from_python(venv / "bin" / "python")
+    assert site is not None
+    assert site.package_info("late") is None
+    install(venv / "lib" / "python3.12" / "site-packages", "late", "3.0", ["late.py"])
+    assert site.package_version("late") == "3.0"
+    assert site.package_module("late") == "late"
+
+
+def test_not_inspectable_without_stdlib(venv):
+    (venv / "pyvenv.cfg").write_text("home = /nonexistent/bin\n", encoding="utf-8")
+    assert SitePackages.from_python(venv / "bin" / "python") is None
@@ -0,0 +1,132 @@
+import os
+import random
+import signal
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+from unittest.mock import ANY
+
+import pytest
+
+from entari_cli.cache import JSONCache
+from entari_cli.process import RestartPolicy, Supervisor, first_process, gather_processes
+
+
+def python(code: str) -> list[str]:
+    return [sys.executable, "-c", code]
+
+
+def test_gather_keeps_order():
+    results = gather_processes([python("import time; time.sleep(0.3); print(1)"), python("print(2)")])
+    assert [result.stdout.strip() for result in results] == ["1", "2"]
+    assert all(result.ok for result in results)
+
+
+def test_first_answer_wins_and_stops_the_others():
+    start = time.monotonic()
+    result = first_process([python("import time; time.sleep(30)"), python("exit(1)"), python("print('fast')")])
+    assert result is not None
+    assert result.stdout.strip() == "fast"
+    assert time.monotonic() - start < 10
+
+
+def test_first_without_answer_returns_a_failure():
+    result = first_process([python("exit(1)"), ["/nonexistent/python"]], timeout=10)
+    assert result is not None
+    assert not result.ok
+
+
+def test_first_with_custom_accept():
+    result = first_process(
+        [python("print('a')"), python("import time; time.sleep(0.3); print('b')")],
+        accept=lambda result: result.stdout.strip() == "b",
+    )
+    assert result is not None
+    assert result.stdout.strip() == "b"
+
+
+@pytest.mark.parametrize(
+    ("mode", "retcode", "expected"),
+    [
+        ("no", 1, False),
+        ("on-failure", 0, False),
+        ("on-failure", 1, True),
+        ("on-failure", -15, True),
+        ("always", 0, True),
+        ("always", 1, True),
+    ],
+)
+def test_should_restart(mode, retcode, expected):
+    assert RestartPolicy(mode).should_restart(retcode) is expected
+
+
+def test_backoff(monkeypatch):
+    monkeypatch.setattr(random, "uniform", lambda a, b: b)
+    policy = RestartPolicy("always", backoff=1.0, max_backoff=5.0)
+    assert [policy.delay(failures) for failures in range(1, 6)] == [1.0, 2.0, 4.0, 5.0, 5.0]
+    monkeypatch.setattr(random, "uniform", lambda a, b: a)
+    assert policy.delay(2) == 1.0
+
+
+def counting_child(isolated, code: int) -> list[str]:
+    return python(f"open({str(isolated / 'runs')!r}, 'a').write('.'); exit({code})")
+
+
+def runs(isolated) -> int:
+    return len((isolated / "runs").read_text())
+
+
+@pytest.mark.parametrize(("mode", "code"), [("no", 1), ("on-failure", 0)])
+def test_not_restarted(isolated, mode, code):
+    assert Supervisor(counting_child(isolated, code), policy=RestartPolicy(mode, backoff=0.01)).run() == code
+    assert runs(isolated) == 1
+
+
+def test_crash_loop_gives_up(isolated, capsys):
+    policy = RestartPolicy("on-failure", max_restarts=2, backoff=0.01)
+    assert Supervisor(counting_child(isolated, 3), policy=policy).run() == 3
+    assert runs(isolated) == 3
+    assert capsys.readouterr().out.count("\n") == 3  # two restarts, then the crash loop
+
+
+def test_always_restarts_successes(isolated):
+    policy = RestartPolicy("always", max_restarts=1, backoff=0.01)
+    assert Supervisor(counting_child(isolated, 0), policy=policy).run() == 0
+    assert runs(isolated) == 2
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="POSIX signals")
+def test_signal_stops_supervision(isolated):
+    timer = threading.Timer(0.5, os.kill, (os.getpid(), signal.SIGTERM))
+    timer.start()
+    start = time.monotonic()
+    policy = RestartPolicy("always", backoff=0.01, grace=5)
+    retcode = Supervisor(python("import time; time.sleep(30)"), policy=policy).run()
+    timer.join()
+    # the child got the signal, and was not restarted
+    assert retcode == -signal.SIGTERM
+    assert time.monotonic() - start < 10
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="no exec on Windows")
+def test_exec_searches_path(isolated):
+    executable = Path(sys.executable)
+    code = (
+        "from entari_cli.cache import JSONCache; from entari_cli.process import exec_process; "
+        f"JSONCache('test').update('key', 'marker', value=1); "
+        f"exec_process({executable.name!r}, '-c', 'import os; print(os.getcwd())', cwd='sub')"
+    )
+    (isolated / "marker").touch()
+    (isolated / "sub").mkdir()
+    env = {
+        **os.environ,
+        "PATH": str(executable.parent),
+        "PYTHONPATH": str(Path(__file__).parents[1] / "src"),
+    }
+    result = subprocess.run([sys.executable, "-c", code], env=env, capture_output=True, text=True, timeout=60)
+    assert result.returncode == 0, result.stderr
+    assert Path(result.stdout.strip()) == (isolated / "sub").resolve()
+    # the caches were written back before the process was replaced
+    assert JSONCache("test").get("key", isolated / "marker") == {"$fingerprint": ANY, "value": 1}
@@ -0,0 +1,99 @@
+import pytest
+
+from entari_cli import py_info
+from entari_cli.cache import JSONCache
+from entari_cli.py_info import ProbeError, invalidate_interpreter_cache, probe_interpreter
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache(monkeypatch):
+    monkeypatch.setattr(py_info, "_interpreter_cache", JSONCache("interpreters"))
+    monkeypatch.setattr(py_info, "_probed", {})
+    py_info._shim_context.cache_clear()
+    py_info._is_script.cache_clear()
+
+
+def new_run(monkeypatch):
+    """Forget what was probed in memory, keeping the on-disk cache."""
+    py_info._interpreter_cache.flush()
+    monkeypatch.setattr(py_info, "_interpreter_cache", JSONCache("interpreters"))
+    monkeypatch.setattr(py_info, "_probed", {})
+    py_info._shim_context.cache_clear()
+
+
+class Probe:
+    def __init__(self, result=None, error=None):
+        self.calls = 0
+        self.result = result or {"version": "3.12.1"}
+        self.error = error
+
+    def __call__(self):
+        self.calls += 1
+        if self.error:
+            raise self.error
+        return self.result
+
+
+def test_probe_once_and_from_cache(isolated, monkeypatch):
+    exe = isolated / "python"
+    exe.write_bytes(b"\x7fELF")
+    probe = Probe()
+    assert probe_interpreter(exe, probe) == {"version": "3.12.1"}
+    assert probe_interpreter(exe, probe) == {"version": "3.12.1"}
+    new_run(monkeypatch)
+    assert probe_interpreter(exe, probe) == {"version": "3.12.1"}
+    assert probe.calls == 1
+
+
+def test_probe_again_when_executable_changes(isolated, monkeypatch):
+    exe = isolated / "python"
+    exe.write_bytes(b"\x7fELF")
+    probe = Probe()
+    probe_interpreter(exe, probe)
+    exe.write_bytes(b"\x7fELF, rebuilt")
+    new_run(monkeypatch)
+    probe_interpreter(exe, probe)
+    assert probe.calls == 2
+
+
+def test_failures_are_cached(isolated, monkeypatch):
+    exe = isolated / "python2.7"
+    exe.write_bytes(b"\x7fELF")
+    probe = Probe(error=OSError("broken"))
+    for _ in range(3):
+        with pytest.raises(ProbeError):
+            probe_interpreter(exe, probe)
+    new_run(monkeypatch)
+    with pytest.raises(ProbeError):
+        probe_interpreter(exe, probe)
+    assert probe.calls == 1
+
+
+def test_shims_are_keyed_on_their_version_files(isolated, monkeypatch):
+    shim = isolated / "python3"
+    shim.write_text('#!/bin/sh\nexec pyenv exec python3 "$@"\n')
+    probe = Probe()
+    probe_interpreter(shim, probe)
+    new_run(monkeypatch)
+    probe_interpreter(shim, probe)
+    assert probe.calls == 1
+
+    (isolated / ".python-version").write_text("3.11\n")
+    new_run(monkeypatch)
+    probe_interpreter(shim, probe)
+    assert probe.calls == 2
+
+    monkeypatch.setenv("PYENV_VERSION", "3.13")
+    new_run(monkeypatch)
+    probe_interpreter(shim, probe)
+    assert probe.calls == 3
+
+
+def test_invalidate(isolated):
+    exe = isolated / "python"
+    exe.write_bytes(b"\x7fELF")
+    probe = Probe()
+    probe_interpreter(exe, probe)
+    invalidate_interpreter_cache(exe)
+    probe_interpreter(exe, probe)
+    assert probe.calls == 2
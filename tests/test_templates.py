@@ -0,0 +1,37 @@
+import json
+import os
+import time
+
+from entari_cli.cache import ARTIFACT_TTL, get_cache_dir
+from entari_cli.installer import Prefetch
+from entari_cli.venv import get_template_dir, prune_venv_templates
+
+
+def make_template(name, age):
+    template = get_template_dir() / name
+    (template / "venv").mkdir(parents=True)
+    with (template / "template.json").open("w", encoding="utf-8") as f:
+        json.dump({"root": "/old/.venv", "prompt": "", "created": time.time() - age}, f)
+    return template
+
+
+def test_expired_templates_are_pruned():
+    fresh = make_template("fresh", 60)
+    stale = make_template("stale", ARTIFACT_TTL + 60)
+    prune_venv_templates()
+    assert fresh.exists()
+    assert not stale.exists()
+
+
+def test_expired_wheels_are_pruned():
+    wheels = get_cache_dir() / "wheels"
+    wheels.mkdir(parents=True)
+    fresh = wheels / "fresh-1.0-py3-none-any.whl"
+    stale = wheels / "stale-1.0-py3-none-any.whl"
+    fresh.touch()
+    stale.touch()
+    old = time.time() - ARTIFACT_TTL - 60
+    os.utime(stale, (old, old))
+    Prefetch([])._prune()
+    assert fresh.exists()
+    assert not stale.exists()